@@ -20,6 +20,13 @@ DEFAULTS = dict(
     # flakehell options
     baseline=None,
     safe=False,
+    streaming=False,
+    split_files=False,
+    cache_backend='sqlite',
+    cache_dir=None,
+    cache_digest='blake2b',
+    cache_max_size=256,  # megabytes
+    cache_max_age=7,  # days
     plugins={
         'pyflakes': ['+*'],
         'pycodestyle': ['+*'],
@@ -55,6 +62,10 @@ class ExitCode(IntEnum):
     TOO_MANY_ARGS = 31
     NOT_ENOUGH_ARGS = 32
 
+    # `daemon` command
+    DAEMON_RUNNING = 41
+    DAEMON_NOT_RUNNING = 42
+
 
 # If a plugin isn't there, it still should be supported.
 # However, support for these plugins is tested on CI.
@@ -1,20 +1,41 @@
 # app
 from ._baseline import make_baseline
-from ._colors import color_code, color_description, colored
+from ._colors import color_code, color_description, colored, use_colors
 from ._config import read_config
+from ._cpu import get_cpu_count
+from ._daemon import SOCKET_PATH, Output, connect, decode_stdin, forward, receive, send
 from ._discover import get_installed
 from ._extractors import extract
-from ._plugin import check_include, get_exceptions, get_plugin_name, get_plugin_rules
-from ._snapshot import Snapshot, prepare_cache
+from ._index import FileIndex, get_git_digests, hash_content
+from ._plan import ChecksPlan
+from ._plugin import (
+    CompiledRules, ExceptionsIndex, check_include,
+    get_exceptions, get_plugin_name, get_plugin_rules,
+)
+from ._registry import REGISTRY_PATH, PluginRegistry
+from ._results import (
+    EncodedResults, count_results, decode_counts, decode_results, encode_results, merge_counts,
+)
+from ._snapshot import (
+    CACHE_PATH, Snapshot, dump_results, get_cache_store, get_fingerprints, get_path_keys,
+)
+from ._stores import STORES, BaseStore, MemoryStore, get_store
 
 
 __all__ = [
     'make_baseline',
     'read_config',
-    'colored', 'color_code', 'color_description',
+    'get_cpu_count',
+    'SOCKET_PATH', 'Output', 'connect', 'decode_stdin', 'forward', 'receive', 'send',
+    'colored', 'color_code', 'color_description', 'use_colors',
     'get_installed',
     'extract',
+    'FileIndex', 'get_git_digests', 'hash_content',
     'get_plugin_name', 'get_plugin_rules', 'check_include', 'get_exceptions',
-    'Snapshot', 'prepare_cache',
+    'REGISTRY_PATH', 'PluginRegistry',
+    'EncodedResults', 'count_results', 'decode_counts', 'decode_results', 'encode_results', 'merge_counts',
+    'CompiledRules', 'ExceptionsIndex', 'ChecksPlan',
+    'CACHE_PATH', 'Snapshot', 'dump_results', 'get_cache_store', 'get_fingerprints', 'get_path_keys',
+    'STORES', 'BaseStore', 'MemoryStore', 'get_store',
     'YesQA',
 ]
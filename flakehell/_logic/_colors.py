@@ -1,33 +1,51 @@
 # built-in
 import re
+import sys
+from functools import lru_cache
 from typing import List
 
-# project
-from colorama import Fore, init, Style
-
-
-init()
 
+# the same codes as in colorama.Fore
 COLOR_CODES = dict(
-    grey=Fore.BLACK,
-    red=Fore.RED,
-    green=Fore.GREEN,
-    yellow=Fore.YELLOW,
-    blue=Fore.BLUE,
-    magenta=Fore.MAGENTA,
-    cyan=Fore.CYAN,
-    white=Fore.WHITE,
+    grey='\033[30m',
+    red='\033[31m',
+    green='\033[32m',
+    yellow='\033[33m',
+    blue='\033[34m',
+    magenta='\033[35m',
+    cyan='\033[36m',
+    white='\033[37m',
 )
+BRIGHT = '\033[1m'
 RESET = '\033[0m'
 
 
+@lru_cache(maxsize=None)
+def _init_colorama() -> None:
+    # colorama translates colors into win32 calls on Windows
+    from colorama import init
+    init()
+
+
+def use_colors() -> bool:
+    """Colors are shown only in a terminal, colorama strips them everywhere else anyway.
+    """
+    isatty = getattr(sys.stdout, 'isatty', None)
+    if isatty is None or not isatty():
+        return False
+    _init_colorama()
+    return True
+
+
 def colored(text: object, color: str, attrs: List[str] = None) -> str:
     """termcolor.colored implementation on top of colorama
     """
-    result = COLOR_CODES[color] + str(text) + Style.RESET_ALL
+    if not use_colors():
+        return str(text)
+    result = COLOR_CODES[color] + str(text) + RESET
     if attrs:
         if 'bold' in attrs or 'underline' in attrs:
-            result = Style.BRIGHT + result
+            result = BRIGHT + result
     return result
 
 
@@ -1,11 +1,13 @@
 # built-in
+from copy import deepcopy
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
-# external
-import toml
-import urllib3
-from flake8.utils import normalize_paths
+
+# Parsed local configs, the key is the file path and the value is the file
+# modification time and size, and the config. The daemon reads the config
+# on every run, so it is parsed again only when the file is changed.
+_LOCAL_CONFIGS = dict()  # type: Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]]
 
 
 def read_config(*paths) -> Dict[str, Any]:
@@ -24,11 +26,25 @@ def read_config(*paths) -> Dict[str, Any]:
 
 
 def _read_local(path: Path) -> Dict[str, Any]:
+    path = path.resolve()
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _LOCAL_CONFIGS.get(path)
+    if cached is not None and cached[0] == version:
+        return deepcopy(cached[1])
+
     with path.open('r') as stream:
-        return _parse_config(stream.read())
+        config = _parse_config(stream.read())
+    # changes in base configs can't be detected
+    if 'base' not in config:
+        _LOCAL_CONFIGS[path] = (version, deepcopy(config))
+    return config
 
 
 def _read_remote(url: str) -> Dict[str, Any]:
+    # it takes longer to import than everything else, and is rarely needed
+    import urllib3
+
     http = urllib3.PoolManager()
     response = http.request('GET', url)
     return _parse_config(response.data.decode())
@@ -48,6 +64,9 @@ def _merge_configs(*configs) -> Dict[str, Any]:
 
 
 def _parse_config(content: str) -> Dict[str, Any]:
+    import toml
+    from flake8.utils import normalize_paths
+
     config = toml.loads(content).get('tool', {}).get('flakehell', {})
     config = dict(config)
 
@@ -0,0 +1,60 @@
+# built-in
+import os
+from math import ceil
+from pathlib import Path
+from typing import Optional
+
+
+CGROUP_PATH = Path('/sys/fs/cgroup')
+
+
+def get_cpu_count(cgroup_path: Path = CGROUP_PATH) -> int:
+    """Get the number of CPUs that the process can actually use.
+
+    `os.cpu_count` reports all CPUs of the host, even in a container
+    that is limited by a CPU affinity mask or a cgroup CPU quota.
+    """
+    count = os.cpu_count() or 1
+    if hasattr(os, 'sched_getaffinity'):
+        count = min(count, len(os.sched_getaffinity(0)) or count)
+    quota = get_cpu_quota(cgroup_path)
+    if quota is not None:
+        count = min(count, quota)
+    return max(count, 1)
+
+
+def get_cpu_quota(cgroup_path: Path = CGROUP_PATH) -> Optional[int]:
+    """Get the CPU quota of the cgroup, rounded up, or None if there is no quota.
+    """
+    # cgroup v2: "max 100000" or "200000 100000"
+    content = _read(cgroup_path / 'cpu.max')
+    if content is not None:
+        quota, _, period = content.partition(' ')
+        if quota == 'max':
+            return None
+        return _divide(quota, period)
+
+    # cgroup v1, the quota is -1 if there is no limit
+    for name in ('cpu', 'cpu,cpuacct'):
+        quota = _read(cgroup_path / name / 'cpu.cfs_quota_us')
+        if quota is not None:
+            return _divide(quota, _read(cgroup_path / name / 'cpu.cfs_period_us'))
+    return None
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except (OSError, ValueError):
+        return None
+
+
+def _divide(quota: str, period: Optional[str]) -> Optional[int]:
+    try:
+        quota_value = int(quota)
+        period_value = int(period or '')
+    except ValueError:
+        return None
+    if quota_value <= 0 or period_value <= 0:
+        return None
+    return max(1, ceil(quota_value / period_value))
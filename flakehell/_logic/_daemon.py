@@ -0,0 +1,96 @@
+# built-in
+import json
+import os
+import socket
+import sys
+from base64 import b64decode, b64encode
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+# app
+from ._colors import use_colors
+from ._snapshot import CACHE_PATH
+
+
+SOCKET_PATH = CACHE_PATH / 'daemon.sock'
+
+
+def send(stream: TextIO, **message) -> None:
+    """Send a message, one JSON-encoded message per line.
+    """
+    stream.write(json.dumps(message) + '\n')
+    stream.flush()
+
+
+def receive(stream: TextIO) -> Optional[Dict[str, Any]]:
+    """Get the next message or None if the connection is closed.
+    """
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def connect() -> Optional[socket.socket]:
+    """Connect to the daemon or return None if it isn't running.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(SOCKET_PATH))
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def forward(argv: List[str]) -> Optional[Tuple[int, str]]:
+    """Run `lint` in the daemon and print the output.
+
+    Returns the exit code and the error message,
+    or None if the daemon isn't running.
+    """
+    client = connect()
+    if client is None:
+        return None
+    stdin = None
+    if '-' in argv:
+        stdin = b64encode(sys.stdin.buffer.read()).decode()
+    with client, client.makefile('rw', encoding='utf8') as stream:
+        send(stream, argv=argv, cwd=os.getcwd(), stdin=stdin, tty=use_colors())
+        while True:
+            message = receive(stream)
+            if message is None:
+                return 1, 'the daemon closed the connection'
+            if 'output' in message:
+                getattr(sys, message['name']).write(message['output'])
+                continue
+            sys.stdout.flush()
+            return message['exit_code'], message['error']
+
+
+def decode_stdin(stdin: str) -> bytes:
+    return b64decode(stdin.encode())
+
+
+class Output:
+    """File-like object that sends everything written into it to the client.
+
+    `name` is the name of the client's stream to write into, `stdout` or `stderr`.
+    `tty` is True if the client's stdout is a terminal, so the output can be colored.
+    """
+
+    def __init__(self, stream: TextIO, name: str, tty: bool = False) -> None:
+        self.stream = stream
+        self.name = name
+        self.tty = tty
+
+    def write(self, text: str) -> int:
+        send(self.stream, output=text, name=self.name)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return self.tty
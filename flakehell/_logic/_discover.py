@@ -1,7 +1,8 @@
 # built-in
 import re
 from collections import defaultdict
-from typing import Any, Dict, Iterable, Iterator
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
 # app
 from ._plugin import get_plugin_name
@@ -22,29 +23,72 @@ ALIASES = {
 }
 
 
-def get_installed(app) -> Iterator[Dict[str, Any]]:
-    plugins_codes = defaultdict(list)
-    versions = dict()
+def get_codes(check: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    """Get prefixes of codes that the check can report, or None if they are unknown.
+
+    The name of the entrypoint is the prefix, unless the plugin has an alias.
+    """
+    codes = ALIASES.get(check['plugin_name'])
+    if codes:
+        return codes
+    if REX_CODE.match(check['name']):
+        return (check['name'], )
+    return None
+
+
+def get_installed(app, cached: bool = True) -> Iterator[Dict[str, Any]]:
+    """Get all installed plugins.
 
+    The result is cached in the plugins registry until installed distributions change,
+    so plugins aren't imported at all if the registry is actual.
+    Pass `cached=False` to import all plugins, for example, to measure import times.
+    """
+    # the app is still initialized to read the config, that commands show with plugins
+    app.skip_all_plugins = cached
     app.initialize([])
+    checkers = app.check_plugins
+    registry = checkers.registry
+    # local plugins can be changed without changing installed distributions
+    has_local = any(plugin.local for plugin in chain(checkers.manager.plugins.values(), checkers.skipped))
+    installed = registry.get_installed() if cached and not has_local else None
+    if installed is not None:
+        yield from installed
+        return
+
+    # show all installed plugins, not only enabled ones
+    checkers.load_skipped(app.option_manager)
+    installed = list(_get_installed(app))
+    if not has_local:
+        registry.set_installed([
+            {key: value for key, value in plugin.items() if key != 'import_time'}
+            for plugin in installed
+        ])
+        registry.save()
+    yield from installed
+
+
+def _get_installed(app) -> Iterator[Dict[str, Any]]:
+    plugins_codes = defaultdict(list)
+    versions = dict()
+    import_times = defaultdict(float)  # type: Dict[str, float]
     codes: Iterable[str]
 
     for check_type in ('ast_plugins', 'logical_line_plugins', 'physical_line_plugins'):
         for plugin in getattr(app.check_plugins, check_type):
             key = (check_type, get_plugin_name(plugin.to_dictionary()))
             versions[key[-1]] = plugin.version
+            import_times[key[-1]] += getattr(plugin, 'load_time', 0.0)
 
             # if codes for plugin specified explicitly in ALIASES, use it
-            codes = ALIASES.get(plugin.plugin_name, [])
-            if codes:
-                plugins_codes[key] = list(codes)
+            if plugin.plugin_name in ALIASES:
+                plugins_codes[key] = list(ALIASES[plugin.plugin_name])
                 continue
 
             # otherwise get codes from plugin entrypoint
-            code = plugin.name
-            if not REX_CODE.match(code):
-                raise ValueError('Invalid code format: {}'.format(code))
-            plugins_codes[key].append(code)
+            codes = get_codes(dict(name=plugin.name, plugin_name=plugin.plugin_name))
+            if codes is None:
+                raise ValueError('Invalid code format: {}'.format(plugin.name))
+            plugins_codes[key].extend(codes)
 
     if 'flake8-docstrings' in versions:
         versions['flake8-docstrings'] = versions['flake8-docstrings'].split(',')[0]
@@ -55,4 +99,5 @@ def get_installed(app) -> Iterator[Dict[str, Any]]:
             name=name,
             codes=sorted(codes),
             version=versions[name],
+            import_time=import_times[name],
         )
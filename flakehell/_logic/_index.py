@@ -0,0 +1,319 @@
+# built-in
+import os
+import sqlite3
+import subprocess
+import threading
+from collections import defaultdict
+from hashlib import blake2b, md5, sha1
+from itertools import chain
+from pathlib import Path
+from time import time
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+
+# (size, mtime_ns, inode, digest)
+IndexEntry = Tuple[int, int, int, str]
+# Files modified less than this amount of seconds ago aren't indexed.
+# Otherwise, a change made in the same mtime tick as hashing could be missed.
+RACY_THRESHOLD = 2
+
+
+def hash_content(content: bytes, algorithm: str) -> str:
+    if algorithm == 'git':
+        hasher = sha1()
+        hasher.update('blob {}\0'.format(len(content)).encode())
+    elif algorithm == 'blake2b':
+        hasher = blake2b(digest_size=16)
+    elif algorithm == 'md5':
+        hasher = md5()
+    else:
+        raise ValueError('invalid digest algorithm: `{}`'.format(algorithm))
+    hasher.update(content)
+    return hasher.hexdigest()
+
+
+def get_git_digests(root: Path) -> Dict[str, str]:
+    """Get blob hashes of files tracked by git and not modified in the working tree.
+    """
+    try:
+        staged = subprocess.run(
+            ['git', 'ls-files', '--stage', '-z'],
+            cwd=str(root), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+        ).stdout.decode('utf8', 'surrogateescape')
+        modified = subprocess.run(
+            ['git', 'ls-files', '--modified', '-z'],
+            cwd=str(root), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+        ).stdout.decode('utf8', 'surrogateescape')
+    except (OSError, subprocess.CalledProcessError):
+        # git isn't installed or it's not a git repository
+        return dict()
+
+    modified_paths = set(modified.split('\0'))
+    digests = dict()
+    for line in staged.split('\0'):
+        if not line:
+            continue
+        info, _, path = line.partition('\t')
+        _mode, digest, stage = info.split()
+        # skip unmerged files
+        if stage != '0' or path in modified_paths:
+            continue
+        digests[os.path.join(str(root), path)] = digest
+    return digests
+
+
+class FileIndex:
+    """Persistent index of files digests, similar to the git index.
+
+    It stores (size, mtime_ns, inode, digest) for every file.
+    If the stat of the file still matches the index,
+    the file isn't read and hashed again.
+
+    The default `blake2b` is faster than `md5` on 64-bit machines.
+    If `algorithm` is `git`, digests are git blob hashes,
+    and for files tracked by git and not modified they are taken
+    from the git index (`git ls-files --stage`) without reading files at all.
+
+    The index also keeps how long every plugin checked every file the last time,
+    to schedule the longest checks first.
+
+    Entries of removed files are removed on `close` after a run that read all files
+    in the project root, and by `prune` for all projects.
+
+    `read` can be called from a few threads at once.
+    """
+    file_name = 'index.sqlite'
+    _connection: Optional[sqlite3.Connection] = None
+    _git: Optional[Dict[str, str]] = None
+
+    def __init__(self, path: Path, algorithm: str = 'blake2b', root: Path = None) -> None:
+        if root is None:
+            root = Path().resolve()
+        self.path = path
+        self.algorithm = algorithm
+        self.root = root
+        self._prefix = str(root).rstrip(os.sep) + os.sep
+        self._entries = None  # type: Optional[Dict[str, IndexEntry]]
+        self._new = dict()  # type: Dict[str, IndexEntry]
+        # paths that were read in this run
+        self._seen = set()  # type: Set[str]
+        self._timings = None  # type: Optional[Dict[str, Dict[str, float]]]
+        self._new_timings = dict()  # type: Dict[str, Mapping[str, float]]
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                str(self.path / self.file_name),
+                timeout=30,
+                check_same_thread=False,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT NOT NULL,
+                    algorithm TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    digest TEXT NOT NULL,
+                    PRIMARY KEY (path, algorithm)
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS timings (
+                    path TEXT NOT NULL,
+                    plugin TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    PRIMARY KEY (path, plugin)
+                )
+            """)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    @property
+    def entries(self) -> Dict[str, IndexEntry]:
+        """Index entries for all files in the project root, loaded by one query.
+        """
+        if self._entries is None:
+            prefix = self._prefix
+            # all paths that start with the prefix
+            rows = self.connection.execute(
+                """
+                    SELECT path, size, mtime, inode, digest FROM files
+                    WHERE algorithm = ? AND path >= ? AND path < ?
+                """,
+                (self.algorithm, prefix, prefix[:-1] + chr(ord(os.sep) + 1)),
+            )
+            self._entries = {row[0]: row[1:] for row in rows}
+        return self._entries
+
+    @property
+    def timings(self) -> Dict[str, Dict[str, float]]:
+        """Seconds that every plugin took to check every file in the project root.
+        """
+        with self._lock:
+            if self._timings is None:
+                prefix = self._prefix
+                rows = self.connection.execute(
+                    'SELECT path, plugin, seconds FROM timings WHERE path >= ? AND path < ?',
+                    (prefix, prefix[:-1] + chr(ord(os.sep) + 1)),
+                )
+                timings = defaultdict(dict)  # type: Dict[str, Dict[str, float]]
+                for path, plugin, seconds in rows:
+                    timings[path][plugin] = seconds
+                self._timings = dict(timings)
+        return self._timings
+
+    def rates(self) -> Dict[str, float]:
+        """Average seconds that every plugin takes to check one byte of a file.
+        """
+        seconds = defaultdict(float)  # type: Dict[str, float]
+        sizes = defaultdict(int)  # type: Dict[str, int]
+        all_timings = self.timings
+        with self._lock:
+            entries = self.entries
+        for path, timings in all_timings.items():
+            entry = entries.get(path)
+            if entry is None or not entry[0]:
+                continue
+            for plugin, plugin_seconds in timings.items():
+                seconds[plugin] += plugin_seconds
+                sizes[plugin] += entry[0]
+        return {plugin: seconds[plugin] / sizes[plugin] for plugin in seconds}
+
+    def set_timings(self, path: Path, timings: Mapping[str, float]) -> None:
+        """Remember how long plugins checked the file, saved on `close`.
+        """
+        self._new_timings[str(path)] = timings
+
+    def digest(self, path: Path) -> Optional[str]:
+        """Get hex digest for the current content of the file.
+
+        Returns None if the file doesn't exist.
+        """
+        return self.read(path)[0]
+
+    def read(self, path: Path) -> Tuple[Optional[str], Optional[bytes]]:
+        """Get hex digest and, if the file had to be read to get the digest, its content.
+
+        The content can be reused to check the file, so it's read only once.
+        """
+        key = str(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None, None
+        signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+        with self._lock:
+            self._seen.add(key)
+            entry = self._new.get(key) or self._get(key)
+        if entry is not None and entry[:3] == signature:
+            return entry[3], None
+
+        digest = None
+        content = None
+        if self.algorithm == 'git':
+            with self._lock:
+                if self._git is None:
+                    self._git = get_git_digests(root=self.root)
+            digest = self._git.get(key)
+        if digest is None:
+            try:
+                content = path.read_bytes()
+            except OSError:
+                return None, None
+            digest = hash_content(content=content, algorithm=self.algorithm)
+
+        if time() - stat.st_mtime > RACY_THRESHOLD:
+            self._new[key] = signature + (digest, )
+        return digest, content
+
+    def clear(self) -> int:
+        """Forget all files. Returns the number of removed entries.
+        """
+        with self.connection:
+            count = self.connection.execute('DELETE FROM files').rowcount
+            self.connection.execute('DELETE FROM timings')
+        self._entries = None
+        self._new.clear()
+        self._seen.clear()
+        self._timings = None
+        self._new_timings.clear()
+        return count
+
+    def prune(self) -> int:
+        """Remove entries of files that don't exist anymore. Returns the number of removed files.
+
+        It checks every file in the index, so it isn't done on every run.
+        """
+        paths = {path for (path, ) in self.connection.execute('SELECT path FROM files')}
+        paths.update(path for (path, ) in self.connection.execute('SELECT path FROM timings'))
+        removed = [path for path in paths if not os.path.exists(path)]
+        self._remove(removed)
+        self._entries = None
+        self._timings = None
+        return len(removed)
+
+    def close(self, prune: bool = False) -> None:
+        """Save all new entries in one transaction.
+
+        Pass `prune` if all files in the project root were read in this run,
+        so entries of other files in the root are removed without checking them.
+        """
+        if self._new:
+            with self.connection:
+                self.connection.executemany(
+                    """
+                        INSERT OR REPLACE INTO files (path, algorithm, size, mtime, inode, digest)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    ((key, self.algorithm) + entry for key, entry in self._new.items()),
+                )
+        if self._new_timings:
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO timings (path, plugin, seconds) VALUES (?, ?, ?)',
+                    (
+                        (key, plugin, seconds)
+                        for key, timings in self._new_timings.items()
+                        for plugin, seconds in timings.items()
+                    ),
+                )
+        if prune:
+            with self._lock:
+                entries = self.entries
+            self._remove([path for path in chain(entries, self.timings) if path not in self._seen])
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self._entries = None
+        self._new.clear()
+        self._seen.clear()
+        self._timings = None
+        self._new_timings.clear()
+
+    def _remove(self, paths: List[str]) -> None:
+        if not paths:
+            return
+        with self.connection:
+            for table in ('files', 'timings'):
+                self.connection.executemany(
+                    'DELETE FROM {} WHERE path = ?'.format(table),
+                    ((path, ) for path in paths),
+                )
+
+    def _get(self, key: str) -> Optional[IndexEntry]:
+        if key.startswith(self._prefix):
+            return self.entries.get(key)
+        # files out of the project root aren't preloaded
+        row = self.connection.execute(
+            'SELECT size, mtime, inode, digest FROM files WHERE path = ? AND algorithm = ?',
+            (key, self.algorithm),
+        ).fetchone()
+        return tuple(row) if row else None  # type: ignore
@@ -0,0 +1,121 @@
+# built-in
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# app
+from ._discover import get_codes
+from ._plugin import (
+    CompiledRules, ExceptionsIndex, PluginsType, get_plugin_name, get_plugin_rules,
+)
+
+
+ChecksType = Dict[str, List[Dict[str, Any]]]
+PlanKey = Tuple[Tuple[str, ...], Optional[FrozenSet[str]]]
+
+
+class ChecksPlan:
+    """Index of checks that should be run for every file.
+
+    The rules for a plugin depend on the file only through matched `exceptions`.
+    So, selected checks are built once for every distinct set of matched exceptions
+    and the same object is shared between all files with this set.
+
+    A check isn't selected if the rules exclude every code that it can report.
+    """
+
+    def __init__(
+        self, checks: ChecksType, plugins: PluginsType,
+        exceptions: Dict[str, PluginsType], root: Path = None,
+    ) -> None:
+        self.plugins = plugins
+        self.exceptions = ExceptionsIndex(exceptions=exceptions, root=root)
+        self._check_types = tuple(checks)
+        self._checks = [
+            (check_type, check, get_plugin_name(check), get_codes(check))
+            for check_type, type_checks in checks.items()
+            for check in type_checks
+        ]
+        self._matches = dict()  # type: Dict[str, Tuple[str, ...]]
+        self._rules = dict()  # type: Dict[Tuple[str, Tuple[str, ...]], List[str]]
+        self._plans = dict()  # type: Dict[PlanKey, Optional[ChecksType]]
+        self._plugins = dict()  # type: Dict[PlanKey, FrozenSet[str]]
+        self._compiled = dict()  # type: Dict[Tuple[str, ...], CompiledRules]
+
+    def checks_for(
+        self, filename: str, plugins: FrozenSet[str] = None,
+    ) -> Optional[ChecksType]:
+        """Get checks to run for the file or None if there is nothing to run.
+
+        If `plugins` is specified, only checks of these plugins are selected.
+        """
+        key = (self._match(filename), plugins)
+        if key not in self._plans:
+            self._plans[key], self._plugins[key] = self._make_plan(*key)
+        return self._plans[key]
+
+    def plugins_for(self, filename: str) -> FrozenSet[str]:
+        """Get names of plugins that should be run for the file.
+        """
+        key = (self._match(filename), None)
+        if key not in self._plugins:
+            self.checks_for(filename)
+        return self._plugins[key]
+
+    def rules_for(self, plugin_name: str, filename: str) -> List[str]:
+        """Get rules for the plugin including rules from matched `exceptions`.
+        """
+        return self._get_rules(plugin_name=plugin_name, path_rules=self._match(filename))
+
+    def compiled_rules_for(self, plugin_name: str, filename: str) -> CompiledRules:
+        """Get compiled rules for the plugin, shared between all files with the same rules.
+        """
+        return self._compile(self.rules_for(plugin_name=plugin_name, filename=filename))
+
+    def _compile(self, rules: List[str]) -> CompiledRules:
+        key = tuple(rules)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = CompiledRules(rules)
+            self._compiled[key] = compiled
+        return compiled
+
+    def _match(self, filename: str) -> Tuple[str, ...]:
+        path_rules = self._matches.get(filename)
+        if path_rules is None:
+            path_rules = self.exceptions.match(filename)
+            self._matches[filename] = path_rules
+        return path_rules
+
+    def _get_rules(self, plugin_name: str, path_rules: Tuple[str, ...]) -> List[str]:
+        key = (plugin_name, path_rules)
+        rules = self._rules.get(key)
+        if rules is None:
+            rules = get_plugin_rules(plugin_name=plugin_name, plugins=self.plugins)
+            exceptions = self.exceptions.rules(path_rules)
+            if exceptions:
+                rules = rules + get_plugin_rules(plugin_name=plugin_name, plugins=exceptions)
+            self._rules[key] = rules
+        return rules
+
+    def _make_plan(
+        self, path_rules: Tuple[str, ...], plugins: Optional[FrozenSet[str]],
+    ) -> Tuple[Optional[ChecksType], FrozenSet[str]]:
+        selected_checks = {check_type: [] for check_type in self._check_types}  # type: ChecksType
+        selected_plugins = set()
+        for check_type, check, plugin_name, codes in self._checks:
+            if plugins is not None and plugin_name not in plugins:
+                continue
+            # do not run plugins without rules specified
+            rules = self._get_rules(plugin_name=plugin_name, path_rules=path_rules)
+            if not rules or set(rules) == {'-*'}:
+                continue
+            # do not run checks that can't report anything with these rules
+            if codes is not None:
+                compiled = self._compile(rules)
+                if not any(compiled.may_include(code) for code in codes):
+                    continue
+            selected_checks[check_type].append(check)
+            selected_plugins.add(plugin_name)
+        if not selected_plugins:
+            return None, frozenset()
+        return selected_checks, frozenset(selected_plugins)
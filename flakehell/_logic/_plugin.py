@@ -1,13 +1,13 @@
 # built-in
+import os
 import re
+from fnmatch import fnmatch, translate
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
-
-# external
-from flake8.utils import fnmatch
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 
 REX_NAME = re.compile(r'[-_.]+')
+REX_GLOB = re.compile(r'[*?[]')
 ALIASES = {
     'aaa': 'flake8-aaa',
     'flake-mutable': 'flake8-mutable',
@@ -22,6 +22,7 @@ ALIASES = {
     'use-fstring-prefix': 'flake8-use-fstring',
 }
 PluginsType = Dict[str, List[str]]
+ALWAYS_INCLUDED = frozenset({'E902', 'E999'})
 
 
 def get_plugin_name(plugin: Dict[str, Any]) -> str:
@@ -75,7 +76,7 @@ def get_plugin_rules(plugin_name: str, plugins: PluginsType) -> List[str]:
     # try to find match by pattern and select the longest
     best_match = (0, [])  # type: Tuple[int, List[str]]
     for pattern, rules in plugins.items():
-        if not fnmatch(filename=plugin_name, patterns=[pattern]):
+        if not fnmatch(plugin_name, pattern):
             continue
         match = len(pattern)
         if match > best_match[0]:
@@ -97,22 +98,75 @@ def check_include(code: str, rules: List[str]) -> bool:
     4. Return False if the latest glob-matching rule is exclude
     """
     # always report exceptions in file processing
-    if code in ('E902', 'E999'):
+    if code in ALWAYS_INCLUDED:
         return True
+    return CompiledRules(rules).include(code)
+
+
+class CompiledRules:
+    """Rules for a plugin prepared to be checked many times.
+
+    It has the same semantic as `check_include` but rules are validated
+    and compiled only once, and the decision is memoized for every code.
+    """
+
+    def __init__(self, rules: List[str]) -> None:
+        for rule in rules:
+            if len(rule) < 2 or rule[0] not in {'-', '+'}:
+                raise ValueError('invalid rule: `{}`'.format(rule))
+        self.rules = rules
 
-    for rule in rules:
-        if len(rule) < 2 or rule[0] not in {'-', '+'}:
-            raise ValueError('invalid rule: `{}`'.format(rule))
+        # the latest rule wins, so the later rules overwrite the earlier ones
+        self._exact = dict()  # type: Dict[str, bool]
+        for rule in rules:
+            self._exact[rule[1:].lower()] = rule[0] == '+'
+        self._globs = [
+            (re.compile(translate(rule[1:])).match, rule[0] == '+')
+            for rule in reversed(rules)
+        ]
+        self._decisions = {code: True for code in ALWAYS_INCLUDED}  # type: Dict[str, bool]
 
-    for rule in reversed(rules):
-        if code.lower() == rule[1:].lower():
-            return rule[0] == '+'
+    def include(self, code: str) -> bool:
+        decision = self._decisions.get(code)
+        if decision is None:
+            decision = self._decide(code)
+            self._decisions[code] = decision
+        return decision
 
-    include = False
-    for rule in rules:
-        if fnmatch(code, patterns=[rule[1:]]):
-            include = rule[0] == '+'
-    return include
+    def _decide(self, code: str) -> bool:
+        decision = self._exact.get(code.lower())
+        if decision is not None:
+            return decision
+        for match, include in self._globs:
+            if match(code):
+                return include
+        return False
+
+    def may_include(self, prefix: str) -> bool:
+        """Check if the rules can include any code that starts with the prefix.
+
+        Returns False only if the rules exclude every code with the prefix.
+        When it can't be decided without the code, returns True.
+        """
+        # a later rule excludes every code with the prefix
+        excluded = False
+        for rule in reversed(self.rules):
+            pattern = rule[1:]
+            literal = REX_GLOB.split(pattern, maxsplit=1)[0]
+            if rule[0] == '-':
+                if pattern == literal + '*' and prefix.startswith(literal):
+                    excluded = True
+                continue
+            # exact rules win over globs in any order
+            if literal == pattern:
+                if pattern.upper().startswith(prefix.upper()):
+                    return True
+                continue
+            if excluded:
+                continue
+            if literal.upper().startswith(prefix.upper()) or prefix.upper().startswith(literal.upper()):
+                return True
+        return False
 
 
 def get_exceptions(
@@ -120,35 +174,96 @@ def get_exceptions(
 ) -> PluginsType:
     if not exceptions:
         return dict()
-    if isinstance(path, str):
-        path = Path(path)
-    if root is None:
-        root = Path().resolve()
-    try:
-        path = path.resolve().relative_to(root).as_posix()
-    except ValueError:
-        # path is not in the project root
-        return dict()
-    exceptions = sorted(
-        exceptions.items(),
-        key=lambda item: len(item[0]),
-        reverse=True,
-    )
+    return ExceptionsIndex(exceptions=exceptions, root=root).get(path)
 
-    aggregated_rules = dict()
 
-    # prefix
-    for path_rule, rules in exceptions:
-        if '*' in path_rule:
-            continue
-        if path.startswith(path_rule):
-            aggregated_rules.update(rules)
+class ExceptionsIndex:
+    """Compiled `exceptions` from the config.
 
-    # glob
-    for path_rule, rules in exceptions:
-        if '*' not in path_rule:
-            continue
-        if fnmatch(filename=path, patterns=[path_rule]):
-            aggregated_rules.update(rules)
+    Path prefixes are stored in a trie and globs are compiled only once,
+    so matching a path costs O(path length + globs count)
+    instead of sorting and checking all exceptions for every file.
+    Resolved directories are memoized, so every directory is resolved only once.
+    """
+    _leaf = ''  # trie nodes keys are single chars, so empty key can't clash
+
+    def __init__(self, exceptions: Dict[str, PluginsType], root: Path = None) -> None:
+        if root is None:
+            root = Path().resolve()
+        self.root = root
+        self.exceptions = exceptions
+        self._trie = dict()  # type: Dict[str, Any]
+        self._globs = []  # type: List[Tuple[str, Callable[[str], Any]]]
+        self._dirs = dict()  # type: Dict[str, Optional[str]]
+
+        # the longest path rules go first (nginx-style)
+        for path_rule in sorted(exceptions, key=len, reverse=True):
+            if '*' in path_rule:
+                self._globs.append((path_rule, re.compile(translate(path_rule)).match))
+                continue
+            node = self._trie
+            for char in path_rule:
+                node = node.setdefault(char, dict())
+            node[self._leaf] = path_rule
+
+    def match(self, path: Union[str, Path]) -> Tuple[str, ...]:
+        """Get path rules that match the path in the order they should be applied.
+        """
+        if not self.exceptions:
+            return ()
+        relative_path = self._relative(str(path))
+        if relative_path is None:
+            return ()
+
+        # prefix, from the longest to the shortest one
+        prefixes = []
+        node = self._trie
+        for char in relative_path:
+            if self._leaf in node:
+                prefixes.append(node[self._leaf])
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            if self._leaf in node:
+                prefixes.append(node[self._leaf])
+        prefixes.reverse()
 
-    return aggregated_rules
+        # glob
+        globs = [path_rule for path_rule, match in self._globs if match(relative_path)]
+        return tuple(prefixes + globs)
+
+    def rules(self, path_rules: Tuple[str, ...]) -> PluginsType:
+        """Aggregate plugins rules for path rules returned by `match`.
+        """
+        aggregated_rules = dict()  # type: PluginsType
+        for path_rule in path_rules:
+            aggregated_rules.update(self.exceptions[path_rule])
+        return aggregated_rules
+
+    def get(self, path: Union[str, Path]) -> PluginsType:
+        return self.rules(self.match(path))
+
+    def _relative(self, path: str) -> Optional[str]:
+        """Get path relative to the root or None if the path is out of the root.
+        """
+        # symlinks must be resolved into the target path
+        if os.path.islink(path):
+            try:
+                return Path(path).resolve().relative_to(self.root).as_posix()
+            except ValueError:
+                return None
+
+        directory, name = os.path.split(path)
+        if directory not in self._dirs:
+            try:
+                relative_dir = Path(directory).resolve().relative_to(self.root).as_posix()
+            except ValueError:
+                relative_dir = None
+            self._dirs[directory] = relative_dir
+        relative_dir = self._dirs[directory]
+        if relative_dir is None:
+            return None
+        if relative_dir == '.':
+            return name
+        return relative_dir + '/' + name
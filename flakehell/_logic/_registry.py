@@ -0,0 +1,130 @@
+# built-in
+import json
+import os
+import sys
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Dict, Iterable, List, Optional
+
+# app
+from ._index import hash_content
+from ._snapshot import CACHE_PATH
+
+
+REGISTRY_PATH = CACHE_PATH / 'plugins.json'
+METADATA_SUFFIXES = ('.dist-info', '.egg-info', '.egg-link')
+
+# name, value, distribution name, and distribution version
+EntryPointType = List[str]
+
+
+def get_fingerprint(paths: Iterable[str]) -> str:
+    """Get a digest of all distributions that can be found on the given paths.
+
+    Only names and modification times of distribution metadata are used,
+    so it's much faster than reading the metadata itself.
+    Any install, upgrade, or removal of a distribution changes the fingerprint.
+    """
+    parts = []
+    for path in paths:
+        parts.append(path)
+        try:
+            entries = list(os.scandir(path or '.'))
+        except OSError:
+            # not a directory, like a zip archive
+            try:
+                parts.append(str(os.stat(path).st_mtime_ns))
+            except OSError:
+                pass
+            continue
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if not entry.name.endswith(METADATA_SUFFIXES):
+                continue
+            try:
+                mtime = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            parts.append('{}:{}'.format(entry.name, mtime))
+    return hash_content('\n'.join(parts).encode('utf8', 'surrogateescape'), algorithm='md5')
+
+
+class PluginRegistry:
+    """Installed plugins, so they don't have to be found and imported on every run.
+
+    + `names` of plugins. Plugin names are known only after the plugin is imported,
+      but the rules from the config are matched by them. The key includes
+      the distribution version, so an updated plugin is imported again.
+    + `entry_points` of all distributions, so metadata of distributions isn't read.
+    + `installed` plugins with their codes and versions, for `plugins` and similar commands.
+
+    Entry points and installed plugins are valid only for the `fingerprint`
+    of distributions that they were found for.
+    """
+
+    def __init__(self, path: Path = REGISTRY_PATH, paths: Iterable[str] = None) -> None:
+        self.path = path
+        self.paths = paths
+        self.changed = False
+        self._fingerprint = None  # type: Optional[str]
+        try:
+            self.data = json.loads(path.read_text())  # type: Dict[str, Any]
+        except (OSError, ValueError):
+            self.data = dict()
+        if not isinstance(self.data.get('names'), dict):
+            self.data = dict(names=dict())
+
+    @property
+    def fingerprint(self) -> str:
+        # calculated on the first use, when all paths for local plugins are added
+        if self._fingerprint is None:
+            paths = self.paths if self.paths is not None else sys.path
+            self._fingerprint = get_fingerprint(paths)
+        return self._fingerprint
+
+    @property
+    def actual(self) -> bool:
+        return self.data.get('fingerprint') == self.fingerprint
+
+    def get(self, key: str) -> Optional[str]:
+        return self.data['names'].get(key)
+
+    def set(self, key: str, name: str) -> None:
+        if self.data['names'].get(key) != name:
+            self.data['names'][key] = name
+            self.changed = True
+
+    def get_entry_points(self, namespace: str) -> Optional[List[EntryPointType]]:
+        if not self.actual:
+            return None
+        return self.data.get('entry_points', {}).get(namespace)
+
+    def set_entry_points(self, namespace: str, entry_points: List[EntryPointType]) -> None:
+        self._invalidate()
+        self.data.setdefault('entry_points', dict())[namespace] = entry_points
+        self.changed = True
+
+    def get_installed(self) -> Optional[List[Dict[str, Any]]]:
+        if not self.actual:
+            return None
+        return self.data.get('installed')
+
+    def set_installed(self, installed: List[Dict[str, Any]]) -> None:
+        self._invalidate()
+        self.data['installed'] = installed
+        self.changed = True
+
+    def _invalidate(self) -> None:
+        if self.actual:
+            return
+        self.data = dict(names=self.data['names'], fingerprint=self.fingerprint)
+        self.changed = True
+
+    def save(self) -> None:
+        if not self.changed:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # concurrent runs never see a partially written file
+        with NamedTemporaryFile('w', dir=str(self.path.parent), suffix='.tmp', delete=False) as stream:
+            json.dump(self.data, stream, sort_keys=True)
+        os.replace(stream.name, str(self.path))
+        self.changed = False
@@ -0,0 +1,104 @@
+# built-in
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# Every result is plugin name, code, line number, column, text, and physical line.
+FIELDS = 6
+# Every count is plugin name, code, count, and texts of the first and the last result.
+COUNT_FIELDS = 5
+
+# `strings` is a table of all strings of the results, and `results` is a flat list
+# of 6 values for every result, where strings are replaced by their position in the table.
+# `counts` is in the same form, if there are counted results.
+EncodedResults = Dict[str, List[Any]]
+
+
+def encode_results(
+    results: Iterable[Sequence[Any]], counts: Iterable[Sequence[Any]] = (),
+) -> EncodedResults:
+    """Encode results into a compact form for sending between processes and caching.
+
+    Plugin names, codes, and texts are repeated for many results,
+    and a physical line is repeated for every result on it.
+    So, every distinct string is stored only once.
+    """
+    strings = []  # type: List[str]
+    positions = dict()  # type: Dict[str, int]
+
+    def intern(value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+        position = positions.get(value)
+        if position is None:
+            position = positions[value] = len(strings)
+            strings.append(value)
+        return position
+
+    encoded = []  # type: List[Any]
+    for plugin_name, code, line_number, column, text, line in results:
+        encoded.extend((
+            intern(plugin_name), intern(code), line_number, column, intern(text), intern(line),
+        ))
+    encoded_counts = []  # type: List[Any]
+    for plugin_name, code, count, first_text, last_text in counts:
+        encoded_counts.extend((
+            intern(plugin_name), intern(code), count, intern(first_text), intern(last_text),
+        ))
+    data = dict(strings=strings, results=encoded)
+    if encoded_counts:
+        data['counts'] = encoded_counts
+    return data
+
+
+def decode_results(data: EncodedResults) -> Iterator[List[Any]]:
+    """Get results back from `encode_results`.
+    """
+    strings = data['strings']
+    encoded = data['results']
+    for start in range(0, len(encoded), FIELDS):
+        plugin_name, code, line_number, column, text, line = encoded[start:start + FIELDS]
+        yield [
+            strings[plugin_name], strings[code], line_number, column, strings[text],
+            None if line is None else strings[line],
+        ]
+
+
+def decode_counts(data: EncodedResults) -> Iterator[List[Any]]:
+    """Get counts back from `encode_results`.
+    """
+    strings = data['strings']
+    encoded = data.get('counts', ())
+    for start in range(0, len(encoded), COUNT_FIELDS):
+        plugin_name, code, count, first_text, last_text = encoded[start:start + COUNT_FIELDS]
+        yield [strings[plugin_name], strings[code], count, strings[first_text], strings[last_text]]
+
+
+def count_results(results: Iterable[Sequence[Any]]) -> List[List[Any]]:
+    """Count results of every plugin and code.
+
+    Texts of the first and the last result are kept in the order of the report,
+    for formatters and statistics that show a message for a code.
+    """
+    counts = dict()  # type: Dict[Tuple[str, str], List[Any]]
+    for result in sorted(results, key=lambda result: (result[1], result[2])):
+        row = counts.get((result[0], result[1]))
+        if row is None:
+            counts[result[0], result[1]] = [result[0], result[1], 1, result[4], result[4]]
+            continue
+        row[2] += 1
+        row[4] = result[4]
+    return list(counts.values())
+
+
+def merge_counts(counts: Iterable[Sequence[Any]]) -> List[List[Any]]:
+    """Merge counts of the same plugin and code, in the given order.
+    """
+    merged = dict()  # type: Dict[Tuple[str, str], List[Any]]
+    for plugin_name, code, count, first_text, last_text in counts:
+        row = merged.get((plugin_name, code))
+        if row is None:
+            merged[plugin_name, code] = [plugin_name, code, count, first_text, last_text]
+            continue
+        row[2] += count
+        row[4] = last_text
+    return list(merged.values())
@@ -1,108 +1,247 @@
 # built-in
 import json
 import os
+from collections import OrderedDict, defaultdict
 from hashlib import md5
+from itertools import chain
 from pathlib import Path
-from time import time
-from typing import Optional
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
 
 # external
-from flake8.checker import FileChecker
-from flake8.options.manager import OptionManager
+from flake8 import __version__ as flake8_version
+
+# app
+from .._constants import VERSION
+from ._index import FileIndex, hash_content
+from ._plugin import ALWAYS_INCLUDED, get_plugin_name
+from ._results import EncodedResults, decode_results, encode_results
+from ._stores import BaseStore, Entry, MemoryStore, get_store
+
+
+if TYPE_CHECKING:
+    from flake8.checker import FileChecker
 
 
 CACHE_PATH = Path(os.environ.get('FLAKEHELL_CACHE', Path.home() / '.cache' / 'flakehell'))
-THRESHOLD = 3600 * 24  # 1 day
 
+# Plugins that get `filename` but use only a part of it.
+# For other plugins that get `filename`, the project-relative path is a part of the cache key.
+PathKey = Callable[[Path], str]
+PATH_KEYS: Mapping[str, PathKey] = MappingProxyType({
+    # the filename is used only in the text of messages that flake8 doesn't show
+    'mccabe': lambda path: '',
+    # `__init__.py` has special rules for unused imports and `__path__`
+    'pyflakes': lambda path: path.name if path.name == '__init__.py' else '',
+})
+# Options that make a plugin from `PATH_KEYS` depend on the whole path when they are set.
+PATH_OPTIONS: Mapping[str, Iterable[str]] = MappingProxyType({
+    # doctests are checked only for files that match these paths
+    'pyflakes': ('include_in_doctest', 'exclude_from_doctest'),
+})
+
+# Flake8 options that plugins use to produce results.
+# Options of plugins themselves are taken from the options groups of plugins.
+# Files with cache aren't read, so `disable_noqa` is here because with it
+# files with top-level `# flake8: noqa` are checked and cached.
+CHECK_OPTIONS = ('disable_noqa', 'hang_closing', 'indent_size', 'max_doc_length', 'max_line_length')
+
+
+def get_cache_store(options, memory: 'OrderedDict[str, Entry]' = None) -> BaseStore:
+    """Get the store for cached results.
+
+    The index of entries of a shared cache is machine-specific, so it is kept in the local cache.
+    If `memory` is passed, entries are also kept in it between runs.
+    """
+    path = CACHE_PATH
+    if options.cache_dir:
+        path = Path(options.cache_dir).expanduser()
+    store = get_store(name=options.cache_backend, path=path, index_path=CACHE_PATH)
+    if memory is not None:
+        store = MemoryStore(store=store, entries=memory)
+    return store
+
+
+def get_fingerprints(
+    plugins: Iterable[Any], options, groups: Mapping[str, Iterable[str]],
+) -> Dict[str, str]:
+    """Get fingerprint for every plugin.
+
+    Fingerprint includes plugin name, version, and options that can affect the plugin results.
+    It is calculated only once per run and then used for cache keys of all files.
+
+    `plugins` is flake8 plugins and `groups` is names of options registered by every plugin.
+    """
+    versions = dict()
+    option_names = defaultdict(set)  # type: Dict[str, Set[str]]
+    for plugin in plugins:
+        name = get_plugin_name(plugin.to_dictionary())
+        versions[name] = plugin.version
+        option_names[name].update(groups.get(plugin.plugin_name, ()))
+
+    fingerprints = dict()
+    for name, version in versions.items():
+        values = {
+            option: getattr(options, option, None)
+            for option in chain(CHECK_OPTIONS, sorted(option_names[name]))
+        }
+        content = json.dumps(
+            [VERSION, flake8_version, name, version, values],
+            sort_keys=True,
+            default=repr,
+        )
+        fingerprints[name] = md5(content.encode()).hexdigest()
+    return fingerprints
+
+
+def get_path_keys(plugins: Iterable[Any], options=None) -> Dict[str, PathKey]:
+    """Get function to make the path part of the cache key for every plugin that depends on the path.
 
-def prepare_cache(path=CACHE_PATH):
-    if not path.exists():
-        path.mkdir(parents=True)
-        return
-    for fpath in path.iterdir():
-        if time() - fpath.stat().st_atime <= THRESHOLD:
+    Results of other plugins depend only on the file content,
+    so they are shared between checkouts in different directories and copies of the same file.
+    """
+    path_keys = dict()
+    for plugin in plugins:
+        if 'filename' not in plugin.parameters:
             continue
-        fpath.unlink()
+        name = get_plugin_name(plugin.to_dictionary())
+        path_key = PATH_KEYS.get(name, Path.as_posix)
+        if any(getattr(options, option, None) for option in PATH_OPTIONS.get(name, ())):
+            path_key = Path.as_posix
+        path_keys[name] = path_key
+    return path_keys
+
+
+def dump_results(store: BaseStore, keys: Mapping[str, str], results: Iterable[list]) -> None:
+    """Save results of plugins, `keys` is the cache key for every plugin to save.
+
+    Results are grouped by plugin, every plugin has its own entry,
+    even if the plugin has found nothing.
+    """
+    grouped_results = {plugin_name: [] for plugin_name in keys}  # type: Dict[str, List[list]]
+    for result in results:
+        # Results of failed file processing don't belong to any plugin.
+        # The file will be checked again on the next run.
+        if result[1] in ALWAYS_INCLUDED:
+            return
+        if result[0] in grouped_results:
+            grouped_results[result[0]].append(result)
+    for plugin_name, plugin_results in grouped_results.items():
+        store.set(keys[plugin_name], encode_results(plugin_results))
 
 
 class Snapshot:
-    _exists: Optional[bool] = None
-    _digest: Optional[str] = None
-    _results = None
+    """Cached results of plugins for a file.
+
+    Every plugin has its own cache entry, so a change in the config
+    invalidates only results of plugins that are affected by the change.
+    Results are cached before filtering by rules, rules are applied on report.
+    Entries are stored in the compact form of `encode_results`.
 
-    def __init__(self, *, cache_path: Path, file_path: Path):
-        self.cache_path = cache_path
+    The key doesn't include the file path, unless the plugin depends on it.
+    If it does, the key includes the path relative to the project root.
+    """
+    _digest: Optional[str] = None
+    _cached: Optional[Dict[str, EncodedResults]] = None
+    # content of the file if it was read to get the digest
+    source: Optional[bytes] = None
+
+    def __init__(
+        self, *, store: BaseStore, index: FileIndex,
+        file_path: Path, fingerprints: Mapping[str, str],
+        path_keys: Mapping[str, PathKey] = MappingProxyType({}),
+    ):
+        self.store = store
+        self.index = index
         self.file_path = file_path
+        self.fingerprints = fingerprints
+        self.path_keys = path_keys
 
     @classmethod
-    def create(cls, checker: FileChecker, options: OptionManager) -> 'Snapshot':
-        hasher = md5()
-
-        # plugins config
-        plugins = json.dumps(options.plugins, sort_keys=True)
-        hasher.update(plugins.encode())
-
-        # file path
-        file_path = Path(checker.filename).resolve()
-        hasher.update(str(file_path).encode())
-
+    def create(
+        cls, checker: 'FileChecker', fingerprints: Mapping[str, str],
+        store: BaseStore, index: FileIndex,
+        path_keys: Mapping[str, PathKey] = MappingProxyType({}),
+    ) -> 'Snapshot':
         return cls(
-            cache_path=CACHE_PATH / (hasher.hexdigest() + '.json'),
-            file_path=file_path,
+            store=store,
+            index=index,
+            file_path=Path(checker.filename).resolve(),
+            fingerprints=fingerprints,
+            path_keys=path_keys,
         )
 
-    def exists(self) -> bool:
-        """Returns True if cache file exists and is actual.
-        """
-        if self._exists is not None:
-            return self._exists
+    @property
+    def relative_path(self) -> Path:
+        return Path(os.path.relpath(str(self.file_path), str(self.index.root)))
 
-        if not self.cache_path.exists():
-            self._exists = False
-            return self._exists
+    def key(self, plugin_name: str) -> str:
+        hasher = md5()
+        hasher.update(plugin_name.encode())
+        hasher.update(self.fingerprints[plugin_name].encode())
+        hasher.update(str(self.digest).encode())
+        # parsers are picked by the file extension
+        hasher.update(self.file_path.suffix.encode())
+        path_key = self.path_keys.get(plugin_name)
+        if path_key is not None:
+            hasher.update(path_key(self.relative_path).encode())
+        return hasher.hexdigest()
 
-        # digest is None for non-existent files (stdin)
-        if self.digest is None:
-            return False
+    @property
+    def cached(self) -> Dict[str, EncodedResults]:
+        """Cached results for every plugin that has actual cache.
+        """
+        if self._cached is None:
+            self._cached = dict()
+            # digest is None for non-existent files (stdin)
+            if self.digest is None:
+                return self._cached
+            for plugin_name in self.fingerprints:
+                cache = self.store.get(self.key(plugin_name))
+                # entries of the old format are checked again and overwritten
+                if cache is not None and 'strings' in cache:
+                    self._cached[plugin_name] = cache
+        return self._cached
 
-        # check that file content wasn't changed since the snapshot
-        cache = json.loads(self.cache_path.read_text())
-        self._exists = self.digest == cache['digest']
-        # if cache is valid results will be eventually requested.
-        # let's save it for later use to avoid reading the cache twice
-        if self._exists:
-            self._results = cache['results']
-        return self._exists  # type: ignore
+    @property
+    def missed(self) -> Set[str]:
+        """Plugins that have no actual cache and should be run.
+        """
+        return set(self.fingerprints) - set(self.cached)
+
+    def exists(self) -> bool:
+        """Returns True if all plugins have actual cache.
+        """
+        return not self.missed
 
     @property
     def digest(self) -> Optional[str]:
         """Get hex digest for the current content of the file
         """
-        # we cache it because it requested twice: from `exists` and from `dumps`
+        # we cache it because it requested for every plugin
         if self._digest is None:
-            if not self.file_path.exists():
-                return None
-            hasher = md5()
-            hasher.update(self.file_path.read_bytes())
-            self._digest = hasher.hexdigest()
+            self._digest, self.source = self.index.read(self.file_path)
         return self._digest
 
-    def dump(self, results) -> None:
-        self.cache_path.write_text(self.dumps(results=results))
+    def set_source(self, source: bytes) -> None:
+        """Use the given content instead of the file content, like an unsaved editor buffer.
+        """
+        self._digest = hash_content(source, algorithm=self.index.algorithm)
+        self.source = source
 
-    def dumps(self, results) -> str:
-        return json.dumps(dict(
+    def dump(self, results) -> None:
+        """Save results of missed plugins.
+        """
+        if self.digest is None:
+            return
+        dump_results(
+            store=self.store,
+            keys={plugin_name: self.key(plugin_name) for plugin_name in self.missed},
             results=results,
-            digest=self.digest,
-        ))
+        )
 
     @property
-    def results(self):
+    def results(self) -> List[list]:
         """returns cached checks results for the given file
         """
-        # results could be cached from `.exists()`.
-        # however, we don't want to cache the results on requets
-        # because they are always requested only once
-        if self._results is not None:
-            return self._results
-        return json.loads(self.cache_path.read_text())['results']
+        return list(chain.from_iterable(map(decode_results, self.cached.values())))
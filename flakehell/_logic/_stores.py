@@ -0,0 +1,401 @@
+# built-in
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from hashlib import md5
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import time
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Type
+
+
+Entry = Dict[str, Any]
+
+# Bump it when the schema changes. Cache with another version is dropped.
+SCHEMA_VERSION = 1
+SCHEMA = (
+    """
+        CREATE TABLE entries (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            size INTEGER NOT NULL,
+            used REAL NOT NULL
+        )
+    """,
+    'CREATE INDEX entries_used ON entries (used)',
+    """
+        CREATE TABLE usage (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            count INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        )
+    """,
+    'INSERT INTO usage (id, count, size) VALUES (0, 0, 0)',
+    """
+        CREATE TRIGGER entries_insert AFTER INSERT ON entries BEGIN
+            UPDATE usage SET count = count + 1, size = size + new.size;
+        END
+    """,
+    """
+        CREATE TRIGGER entries_delete AFTER DELETE ON entries BEGIN
+            UPDATE usage SET count = count - 1, size = size - old.size;
+        END
+    """,
+)
+# Don't update the last usage time of an entry more often than that.
+# So, runs that only read cache don't write anything.
+TOUCH_INTERVAL = 3600
+# When the cache is too big, evict entries until it shrinks to this part of the budget.
+# So, the eviction doesn't run again on the next run.
+LOW_WATERMARK = 0.8
+# How many entries `MemoryStore` keeps between runs.
+MEMORY_ENTRIES = 100000
+
+
+class Usage(NamedTuple):
+    count: int
+    size: int  # bytes
+    oldest: Optional[float]  # timestamp of the least recently used entry
+
+
+class BaseStore:
+    """Storage for snapshots. Every entry is a JSON-serializable dict.
+    """
+
+    def __init__(self, path: Path, index_path: Path = None) -> None:
+        self.path = path
+
+    def get(self, key: str) -> Optional[Entry]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Entry) -> None:
+        raise NotImplementedError
+
+    def usage(self) -> Usage:
+        raise NotImplementedError
+
+    def prune(self, max_size: int, max_age: float) -> int:
+        """Evict entries if the cache is out of the budget.
+
+        `max_size` is in bytes, `max_age` is in seconds.
+        Returns the number of removed entries.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> int:
+        """Remove all entries. Returns the number of removed entries.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Save all pending changes.
+        """
+
+
+class IndexedStore(BaseStore):
+    """Base class for stores that track entries in a small SQLite database.
+
+    The database knows size and last usage time of every entry,
+    and the total size of the cache is maintained by triggers.
+    So, checking the budget is two cheap queries, without scanning the cache.
+
+    Changes are buffered in memory and written in one transaction on `close`.
+    `get` can be called from a few threads at once.
+    """
+    file_name: str
+    _connection: Optional[sqlite3.Connection] = None
+
+    def __init__(self, path: Path, index_path: Path = None) -> None:
+        super().__init__(path=path)
+        self.index_path = index_path or path
+        self._new = dict()  # type: Dict[str, str]
+        self._used = set()  # type: Set[str]
+        # entries that exist but aren't in the index, with their size
+        self._adopted = dict()  # type: Dict[str, int]
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.index_path.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                str(self.index_path / self.file_name),
+                timeout=30,
+                check_same_thread=False,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            # `INSERT OR REPLACE` fires the delete trigger for the replaced row
+            connection.execute('PRAGMA recursive_triggers=ON')
+            if self._version(connection) != SCHEMA_VERSION:
+                self._migrate(connection)
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def _version(connection: sqlite3.Connection) -> int:
+        return connection.execute('PRAGMA user_version').fetchone()[0]
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        """Drop the cache of an old version and create the actual schema.
+        """
+        connection.execute('BEGIN IMMEDIATE')
+        # a concurrent run could do it while we were waiting for the lock
+        if self._version(connection) != SCHEMA_VERSION:
+            tables = connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'",
+            ).fetchall()
+            for (table, ) in tables:
+                connection.execute('DROP TABLE "{}"'.format(table))
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+        connection.commit()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            value = self._new.get(key)
+            if value is None:
+                row = self.connection.execute(
+                    'SELECT value, used FROM entries WHERE key = ?', (key, ),
+                ).fetchone()
+        if value is None:
+            value = self._read(key=key, value=None if row is None else row[0])
+            if value is None:
+                return None
+            if row is None:
+                self._adopted[key] = len(value)
+            elif time() - row[1] > TOUCH_INTERVAL:
+                self._used.add(key)
+        return json.loads(value)
+
+    def set(self, key: str, value: Entry) -> None:
+        self._new[key] = json.dumps(value)
+
+    def usage(self) -> Usage:
+        count, size = self.connection.execute(
+            'SELECT count, size FROM usage WHERE id = 0',
+        ).fetchone()
+        # uses the index, no table scan
+        oldest = self.connection.execute('SELECT MIN(used) FROM entries').fetchone()[0]
+        return Usage(count=count, size=size, oldest=oldest)
+
+    def prune(self, max_size: int, max_age: float) -> int:
+        usage = self.usage()
+        threshold = time() - max_age
+        expired = usage.oldest is not None and usage.oldest < threshold
+        if not expired and usage.size <= max_size:
+            return 0
+
+        # the least recently used entries go first
+        target = max_size * LOW_WATERMARK if usage.size > max_size else max_size
+        evicted = []  # type: List[str]
+        size = usage.size
+        rows = self.connection.execute('SELECT key, size, used FROM entries ORDER BY used')
+        for key, entry_size, used in rows:
+            if used >= threshold and size <= target:
+                break
+            evicted.append(key)
+            size -= entry_size
+        rows.close()
+
+        with self.connection:
+            self.connection.executemany(
+                'DELETE FROM entries WHERE key = ?',
+                ((key, ) for key in evicted),
+            )
+        self._remove(evicted)
+        return len(evicted)
+
+    def clear(self) -> int:
+        keys = [key for (key, ) in self.connection.execute('SELECT key FROM entries')]
+        with self.connection:
+            self.connection.execute('DELETE FROM entries')
+        self._remove(keys)
+        self._new.clear()
+        self._used.clear()
+        self._adopted.clear()
+        return len(keys)
+
+    def close(self) -> None:
+        if self._connection is None and not self._new:
+            return
+        now = time()
+        rows = []
+        for key, value in self._new.items():
+            # `json.dumps` escapes non-ASCII characters, so length is the size in bytes
+            rows.append((key, self._write(key=key, value=value), len(value), now))
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO entries (key, value, size, used) VALUES (?, ?, ?, ?)',
+                rows,
+            )
+            self.connection.executemany(
+                'UPDATE entries SET used = ? WHERE key = ?',
+                ((now, key) for key in self._used - set(self._new)),
+            )
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO entries (key, value, size, used) VALUES (?, NULL, ?, ?)',
+                ((key, size, now) for key, size in self._adopted.items() if key not in self._new),
+            )
+        self.connection.close()
+        self._connection = None
+        self._new.clear()
+        self._used.clear()
+        self._adopted.clear()
+
+    def _read(self, key: str, value: Optional[str]) -> Optional[str]:
+        """Get serialized value of the entry. `value` is what is stored in the database.
+        """
+        raise NotImplementedError
+
+    def _write(self, key: str, value: str) -> Optional[str]:
+        """Save serialized value of the entry and return what to store in the database.
+        """
+        raise NotImplementedError
+
+    def _remove(self, keys: Iterable[str]) -> None:
+        """Remove values of evicted entries that are stored outside of the database.
+        """
+
+
+class JSONStore(IndexedStore):
+    """One JSON file per entry in the cache directory.
+
+    Entries are written atomically, so the directory can be shared
+    between many machines, like CI runners with a network filesystem.
+    In that case, the index of entries is stored locally in `index_path`
+    and tracks entries that were written or read on this machine.
+    """
+
+    def __init__(self, path: Path, index_path: Path = None) -> None:
+        super().__init__(path=path, index_path=index_path)
+        self.file_name = 'entries.sqlite'
+        if self.index_path != self.path:
+            # the same local directory can keep indices for a few shared directories
+            path_hash = md5(str(path.resolve()).encode()).hexdigest()[:12]
+            self.file_name = 'entries-{}.sqlite'.format(path_hash)
+        path.mkdir(parents=True, exist_ok=True)
+
+    def _read(self, key: str, value: Optional[str]) -> Optional[str]:
+        try:
+            return (self.path / (key + '.json')).read_text()
+        except OSError:
+            return None
+
+    def _write(self, key: str, value: str) -> Optional[str]:
+        # Write into a temporary file and then atomically move it on place.
+        # So, concurrent runs never see a partially written entry.
+        with NamedTemporaryFile('w', dir=str(self.path), suffix='.tmp', delete=False) as stream:
+            stream.write(value)
+        os.replace(stream.name, str(self.path / (key + '.json')))
+        return None
+
+    def _remove(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            try:
+                (self.path / (key + '.json')).unlink()
+            except FileNotFoundError:
+                # removed by a concurrent run
+                continue
+
+    def clear(self) -> int:
+        count = super().clear()
+        # files that aren't tracked, like entries written by other machines
+        # or temporary files left by killed processes
+        for pattern in ('*.json', '*.tmp'):
+            for fpath in self.path.glob(pattern):
+                try:
+                    fpath.unlink()
+                except FileNotFoundError:
+                    continue
+                if fpath.suffix == '.json':
+                    count += 1
+        return count
+
+
+class SQLiteStore(IndexedStore):
+    """All entries in one SQLite database.
+
+    SQLite locks don't work reliably on network filesystems,
+    so use `JSONStore` for a cache shared between machines.
+    """
+    file_name = 'snapshots.sqlite'
+
+    def __init__(self, path: Path, index_path: Path = None) -> None:
+        # the database is the storage, so it is always in the cache directory
+        super().__init__(path=path)
+
+    def _read(self, key: str, value: Optional[str]) -> Optional[str]:
+        return value
+
+    def _write(self, key: str, value: str) -> Optional[str]:
+        return value
+
+
+class MemoryStore(BaseStore):
+    """Keep entries of another store in memory, used by the daemon.
+
+    `entries` is shared between runs, the least recently used entries are evicted from it.
+    Entries from memory aren't marked as used in the wrapped store.
+    """
+
+    def __init__(
+        self, store: BaseStore, entries: 'OrderedDict[str, Entry]', max_entries: int = MEMORY_ENTRIES,
+    ) -> None:
+        super().__init__(path=store.path)
+        self.store = store
+        self.entries = entries
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                return value
+        value = self.store.get(key)
+        if value is not None:
+            self._remember(key=key, value=value)
+        return value
+
+    def set(self, key: str, value: Entry) -> None:
+        self.store.set(key, value)
+        self._remember(key=key, value=value)
+
+    def usage(self) -> Usage:
+        return self.store.usage()
+
+    def prune(self, max_size: int, max_age: float) -> int:
+        return self.store.prune(max_size=max_size, max_age=max_age)
+
+    def clear(self) -> int:
+        with self._lock:
+            self.entries.clear()
+        return self.store.clear()
+
+    def close(self) -> None:
+        self.store.close()
+
+    def _remember(self, key: str, value: Entry) -> None:
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+STORES: Mapping[str, Type[BaseStore]] = MappingProxyType({
+    'json': JSONStore,
+    'sqlite': SQLiteStore,
+})
+
+
+def get_store(name: str, path: Path, index_path: Path = None) -> BaseStore:
+    if name not in STORES:
+        raise ValueError('invalid cache backend: `{}`'.format(name))
+    return STORES[name](path=path, index_path=index_path)
@@ -1,5 +1,7 @@
 # app
 from ._app import FlakeHellApplication
+from ._server import LanguageServer
+from ._watcher import Watcher
 
 
-__all__ = ['FlakeHellApplication']
+__all__ = ['FlakeHellApplication', 'LanguageServer', 'Watcher']
@@ -1,19 +1,24 @@
 # built-in
 import sys
 from argparse import ArgumentParser
+from collections import OrderedDict
+from contextlib import redirect_stderr
+from io import StringIO
 from itertools import chain
 from pathlib import Path
+from time import time
 from typing import Any, Dict, List, Optional, Tuple
 
 # external
+from flake8 import configure_logging
 from flake8.main.application import Application
-from flake8.options.config import MergedConfigParser, get_local_plugins
+from flake8.options.config import ConfigFileFinder, MergedConfigParser, get_local_plugins
 from flake8.plugins.manager import ReportFormatters
 from flake8.utils import parse_unified_diff
 
 # app
 from .._constants import DEFAULTS
-from .._logic import read_config
+from .._logic import STORES, read_config
 from ._checkers import FlakeHellCheckersManager
 from ._plugins import FlakeHellCheckers
 from ._style_guide import FlakeHellStyleGuideManager
@@ -41,6 +46,14 @@ class FlakeHellApplication(Application):
     + register custom formatters
     """
     guide: FlakeHellStyleGuideManager
+    # cached results that are kept in memory between runs, used by the daemon
+    memory: Optional['OrderedDict[str, Any]'] = None
+    # don't load plugins that aren't enabled by the config for any file
+    skip_disabled_plugins = True
+    # don't load any plugins, for commands that show plugins from the registry
+    skip_all_plugins = False
+    # plugins are found and their options are registered, see `initialize`
+    plugins_registered = False
 
     @property
     def option_manager(self):
@@ -55,18 +68,58 @@ class FlakeHellApplication(Application):
         group = manager.parser.add_argument_group('FlakeHell')
         group.add_argument('--baseline', help='path to baseline')
         group.add_argument('--safe', action='store_true', help='suppress exceptions from plugins')
+        group.add_argument(
+            '--streaming',
+            action='store_true',
+            help='report results of every file as soon as it is checked',
+        )
+        group.add_argument(
+            '--split-files',
+            action='store_true',
+            help='check big files by a few jobs at once, every job runs a part of plugins',
+        )
+        group.add_argument(
+            '--cache-backend',
+            choices=sorted(STORES),
+            help='storage for cached results',
+        )
+        group.add_argument(
+            '--cache-dir',
+            help='directory for cached results, can be shared between machines with `json` backend',
+        )
+        group.add_argument(
+            '--cache-digest',
+            choices=('blake2b', 'git', 'md5'),
+            help='algorithm to detect changes in files',
+        )
+        group.add_argument(
+            '--cache-max-size',
+            type=int,
+            help='maximum size of cached results in megabytes',
+        )
+        group.add_argument(
+            '--cache-max-age',
+            type=float,
+            help='remove cached results that were not used for this amount of days',
+        )
         self._option_manager = manager
 
     def get_toml_config(self, path: Path = None) -> Dict[str, Any]:
-        if path is not None:
-            return read_config(path)
+        if path is None:
+            path = self.find_toml_config()
+        if path is None:
+            return dict()
+        return read_config(path)
+
+    @staticmethod
+    def find_toml_config() -> Optional[Path]:
         # lookup for config from current dir up to root
         root = Path().resolve()
         for dir_path in chain([root], root.parents):
             path = dir_path / 'pyproject.toml'
             if path.exists():
-                return read_config(path)
-        return dict()
+                return path
+        return None
 
     @staticmethod
     def extract_toml_config_path(argv: List[str]) -> Tuple[Optional[Path], List[str]]:
@@ -100,6 +153,10 @@ class FlakeHellApplication(Application):
         # before passing into flake8 mechanisms
         config_path, argv = self.extract_toml_config_path(argv=argv)
 
+        # options of skipped plugins are unknown, so they must be loaded to parse them
+        if self.check_plugins.skipped and self._has_unknown_options(argv):
+            self.check_plugins.load_skipped(self.option_manager)
+
         # make default config
         config, _ = self.option_manager.parse_args([])
         config.__dict__.update(DEFAULTS)
@@ -149,9 +206,66 @@ class FlakeHellApplication(Application):
             extra_args=self.args,
         )
 
+    def _has_unknown_options(self, argv: List[str]) -> bool:
+        # help shows options of all plugins
+        if '-h' in argv or '--help' in argv:
+            return True
+        try:
+            # errors are reported by the real parsing later
+            with redirect_stderr(StringIO()):
+                _, unknown = self.option_manager.parser.parse_known_args(argv)
+        except SystemExit:
+            return True
+        return any(arg.startswith('-') for arg in unknown)
+
+    def initialize(self, argv: List[str]) -> None:
+        """Reloaded to initialize the app again for a new run without loading plugins again.
+
+        The daemon keeps initialized apps and runs them with new arguments.
+        Options, the formatter, the style guide, and the checkers manager are made for every run.
+        """
+        if not self.plugins_registered:
+            super().initialize(argv)
+            return
+
+        # forget the previous run
+        self.formatter = None
+        self.guide = None
+        self.result_count = self.total_result_count = 0
+        self.catastrophic_failure = False
+        self.running_against_diff = False
+        self.parsed_diff = dict()
+        self.start_time = time()
+        self.end_time = None
+
+        prelim_opts, remaining_args = self.parse_preliminary_options(argv)
+        configure_logging(prelim_opts.verbose, prelim_opts.output_file)
+        config_finder = ConfigFileFinder(
+            self.program,
+            prelim_opts.append_config,
+            config_file=prelim_opts.config,
+            ignore_config_files=prelim_opts.isolated,
+        )
+        self.parse_configuration_and_cli(config_finder, remaining_args)
+        self.make_formatter()
+        self.make_guide()
+        self.make_file_checker_manager()
+
+    def register_plugin_options(self) -> None:
+        super().register_plugin_options()
+        self.plugins_registered = True
+
     def make_file_checker_manager(self) -> None:
+        option_groups = {
+            group.title: [action.dest for action in group._group_actions]
+            for group in self.option_manager.parser._action_groups
+        }
         self.file_checker_manager = FlakeHellCheckersManager(
             baseline=self.options.baseline,
+            option_groups=option_groups,
+            memory=self.memory,
+            diff=self.parsed_diff if self.running_against_diff else None,
+            aggregate=hasattr(self.formatter, 'handle_count'),
             style_guide=self.guide,
             arguments=self.args,
             checker_plugins=self.check_plugins,
@@ -162,9 +276,36 @@ class FlakeHellApplication(Application):
         sys.path.extend(local_plugins.paths)
         self.check_plugins = FlakeHellCheckers(local_plugins.extension)  # this line is changed
         self.formatting_plugins = ReportFormatters(local_plugins.report)
+        if self.skip_all_plugins:
+            self.check_plugins.skip_disabled(plugins=dict(), exceptions=dict())
+        elif self.skip_disabled_plugins:
+            config_path = None
+            if config_finder.config_file and config_finder.config_file.endswith('.toml'):
+                config_path = Path(config_finder.config_file).expanduser()
+            config = self.get_toml_config(config_path)
+            self.check_plugins.skip_disabled(
+                plugins=config.get('plugins', DEFAULTS['plugins']),
+                exceptions=config.get('exceptions', DEFAULTS['exceptions']),
+            )
         self.check_plugins.load_plugins()
         self.formatting_plugins.load_plugins()
 
+    def run_checks(self, files: List[str] = None) -> None:
+        # in streaming mode, results are reported while checks are running
+        if self.options.streaming:
+            self.formatter.start()
+        super().run_checks(files)
+
+    def report(self) -> None:
+        """Patched `report` to not start the formatter twice in streaming mode.
+        """
+        if not self.options.streaming:
+            self.formatter.start()
+        self.report_errors()
+        self.report_statistics()
+        self.report_benchmarks()
+        self.formatter.stop()
+
     def make_formatter(self, *args, **kwargs) -> None:
         if self.formatter is None:
             super().make_formatter(*args, **kwargs)
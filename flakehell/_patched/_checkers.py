@@ -1,21 +1,62 @@
 # built-in
-from collections import defaultdict
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
+from math import ceil
+from multiprocessing.util import Finalize
 from pathlib import Path
-from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from time import perf_counter
+from types import MappingProxyType
+from typing import (
+    Any, Deque, Dict, FrozenSet, Iterable, Iterator, List,
+    Mapping, NamedTuple, Optional, Set, Tuple, Union,
+)
 
 # external
-from flake8.checker import FileChecker, Manager
+from flake8.checker import FileChecker, Manager, _try_initialize_processpool
+from flake8.defaults import NOQA_FILE, STATISTIC_NAMES
+from flake8.exceptions import EarlyQuit
+from flake8.style_guide import Violation
 from flake8.utils import filenames_from, fnmatch
 
 # app
 from .._logic import (
-    Snapshot, check_include, get_exceptions, get_plugin_name,
-    get_plugin_rules, make_baseline, prepare_cache,
+    CACHE_PATH, BaseStore, ChecksPlan, CompiledRules, EncodedResults, FileIndex, Snapshot,
+    count_results, decode_counts, decode_results, dump_results, encode_results,
+    get_cache_store, get_cpu_count, get_fingerprints, get_path_keys, get_plugin_name,
+    make_baseline, merge_counts,
 )
+from .._logic._plugin import ALWAYS_INCLUDED
+from ..parsers import PythonParser
 from ._processor import FlakeHellProcessor
 
 
 DEFAULT_PLUGIN = 'pycodestyle'
+# Threads to read, hash, and look up files in cache.
+# Reading, hashing, and SQLite queries release the GIL.
+PREFETCH_THREADS = min(32, (os.cpu_count() or 1) + 4)
+# In streaming mode, how many files can be in progress after the first not reported file.
+REORDER_WINDOW = 256
+# The max number of files in one call of a batch plugin.
+# Smaller batches are made to give work for all jobs.
+BATCH_SIZE = 64
+# Files without cache are checked in the main process until the expected time
+# to check them, in seconds, or the number of them is above this.
+# Starting workers takes longer than checking a few files.
+SERIAL_MAX_COST = 0.25
+SERIAL_MAX_FILES = 64
+# Tasks that are expected to take less than this, in seconds, are sent into workers together.
+CHUNK_COST = 0.02
+# Seconds to check one byte by a plugin that has no recorded timings yet.
+DEFAULT_RATE = 5e-6
+# With `--split-files`, files that are expected to take longer than this, in seconds,
+# are checked by a few tasks with different plugins.
+SPLIT_MIN_COST = 0.5
+
+LOG = logging.getLogger(__name__)
 
 
 class Result(NamedTuple):
@@ -27,16 +68,206 @@ class Result(NamedTuple):
     line: str
 
 
+# filename, results (None if the file is ignored), statistics, seconds spent by every plugin.
+# When the results are sent from a task, they are filtered and encoded by `encode_results`,
+# and the number of found results before filtering is added.
+CheckResult = Tuple[str, Optional[List[Result]], Dict[str, int], Dict[str, float]]
+FilteredResult = Tuple[str, Optional[EncodedResults], Dict[str, int], Dict[str, float], int]
+
+
+class Checked(NamedTuple):
+    index: int
+    # None for files that have cache for all plugins
+    ret: Optional[FilteredResult]
+
+
+class Task(NamedTuple):
+    index: int
+    filename: str
+    # None if only batch plugins should be run for the file
+    checks: Optional[Dict[str, Any]]
+    options: Any
+    # content of the file if it's already read
+    source: Optional[bytes]
+    # expected time to check the file, in seconds
+    cost: float = 0.0
+    # cache key for every plugin to run, empty if results can't be cached
+    keys: Mapping[str, str] = MappingProxyType({})
+
+
+class BatchTask(NamedTuple):
+    check: Dict[str, Any]
+    # index and name of every file in the batch
+    files: List[Tuple[int, str]]
+    options: Any
+    cost: float = 0.0
+    # cache key for the file index, files without the key aren't cached
+    keys: Mapping[int, str] = MappingProxyType({})
+
+
+class ChunkTask(NamedTuple):
+    """A few small files that are sent into a worker at once.
+    """
+    tasks: List[Task]
+    cost: float = 0.0
+
+
+AnyTask = Union[Task, BatchTask, ChunkTask]
+
+
+class TaskContext:
+    """Everything that tasks of a run need but that is the same for all of them.
+
+    Results are saved into the cache and filtered right in the task.
+    So, results that won't be reported aren't sent from workers into the main process.
+    If `aggregate` is set, only counts of results are sent.
+    Workers are forked, so they get the context of the run without pickling it for every task.
+    """
+
+    def __init__(
+        self, store: BaseStore, plan: ChecksPlan, options,
+        baseline: Set[str], diff: Optional[Dict[str, Set[int]]] = None, aggregate: bool = False,
+    ) -> None:
+        self.plan = plan
+        self.options = options
+        self.baseline = baseline
+        self.diff = diff
+        self.aggregate = aggregate
+        self._store = store
+        self._pid = os.getpid()
+
+    @property
+    def store(self) -> BaseStore:
+        """The cache store of the current process.
+
+        A forked worker can't use the database connection of the main process,
+        so it opens its own store for all its tasks and saves it once on exit.
+        The store of the main process is closed on report.
+        """
+        if self._pid != os.getpid():
+            self._store = get_cache_store(self.options)
+            self._pid = os.getpid()
+            Finalize(None, self._store.close, exitpriority=10)
+        return self._store
+
+    def finish(self, ret: CheckResult, keys: Mapping[str, str]) -> FilteredResult:
+        """Save results of the task into the cache and leave only results to report.
+        """
+        filename, results, statistics, timings = ret
+        if results is None:
+            return filename, None, statistics, timings, 0
+        results = [_make_result(result) for result in results]
+        if keys:
+            dump_results(store=self.store, keys=keys, results=results)
+        reported = encode_results(*self.split(self.filter(filename, results)))
+        return filename, reported, statistics, timings, len(results)
+
+    def split(self, results: List[Result]) -> Tuple[List[Result], List[List[Any]]]:
+        """Split results into results to report one by one and counts of results.
+
+        Errors of reading and parsing the file are always reported one by one,
+        so they are deduplicated between a few tasks for the same file.
+        """
+        if not self.aggregate:
+            return results, []
+        counted = [result for result in results if result.error_code not in ALWAYS_INCLUDED]
+        if not counted:
+            return results, []
+        reported = [result for result in results if result.error_code in ALWAYS_INCLUDED]
+        return reported, count_results(counted)
+
+    def get_display_name(self, filename: str) -> str:
+        if filename is None or filename == '-':
+            return self.options.stdin_display_name or 'stdin'
+        return filename
+
+    def filter(self, filename: str, results: Iterable[Result]) -> List[Result]:
+        """Drop results that won't be reported.
+
+        The same checks as on report: codes ignored for the parser, excluded codes,
+        baseline, lines out of `--diff`, and `# noqa` comments.
+        """
+        # Some codes are ignored for a specific parser.
+        # The parser is known without reading the file.
+        ignored = FlakeHellProcessor.get_parser(Path(filename)).ignore  # type: Dict[str, Any]
+        display_name = self.get_display_name(filename)
+        diff_lines = None  # type: Optional[Set[int]]
+        if self.diff:
+            diff_lines = self.diff.get(display_name) or set()
+        rules = dict()  # type: Dict[str, CompiledRules]
+        reported = []  # type: List[Result]
+        for result in results:
+            # For example, lack of blank lines for YAML parser.
+            if result.error_code in ignored.get(result.plugin_name, ()):
+                continue
+
+            # skip explicitly excluded codes
+            plugin_rules = rules.get(result.plugin_name)
+            if plugin_rules is None:
+                plugin_rules = self.plan.compiled_rules_for(
+                    plugin_name=result.plugin_name,
+                    filename=display_name,
+                )
+                rules[result.plugin_name] = plugin_rules
+            if not plugin_rules.include(result.error_code):
+                continue
+
+            # skip baselined errors
+            if self.baseline:
+                digest = make_baseline(
+                    path=display_name,
+                    context=result.line,
+                    code=result.error_code,
+                    line=result.line_number,
+                )
+                if digest in self.baseline:
+                    continue
+
+            # skip errors out of the diff
+            if diff_lines is not None and result.line_number not in diff_lines:
+                continue
+
+            # skip errors with `# noqa` comment
+            violation = Violation(
+                result.error_code, display_name, result.line_number,
+                (result.column or 0) + 1, result.text, result.line,
+            )
+            if violation.is_inline_ignored(self.options.disable_noqa):
+                continue
+            reported.append(result)
+        return reported
+
+
+# The context of the current run, workers get it when the pool is started.
+_CONTEXT = None  # type: Optional[TaskContext]
+
+
 class FlakeHellCheckersManager(Manager):
     """
     Patched flake8.checker.Manager to provide `plugins` support
     """
 
-    def __init__(self, baseline: Optional[str], **kwargs):
+    def __init__(
+        self, baseline: Optional[str], option_groups: Dict[str, List[str]] = None,
+        memory: 'OrderedDict[str, Any]' = None, diff: Dict[str, Set[int]] = None,
+        aggregate: bool = False, **kwargs,
+    ):
         self.baseline = set()
         if baseline:
             with open(baseline) as stream:
                 self.baseline = {line.strip() for line in stream}
+        # changed lines of every file when running with `--diff`
+        self.diff = diff
+        # report only counts of results, for formatters that don't need anything else
+        self.aggregate = aggregate
+        # names of options registered by every plugin
+        self.option_groups = option_groups or dict()
+        # cached results that are kept in memory between runs
+        self.memory = memory
+        # set to stop sending files into checks, see `cancel`
+        self.cancelled = threading.Event()
+        # set if all files in the project root are checked
+        self.whole_root = False
         super().__init__(**kwargs)
 
     def make_checkers(self, paths: List[str] = None) -> None:
@@ -49,65 +280,428 @@ class FlakeHellCheckersManager(Manager):
             paths = self.arguments
         if not paths:
             paths = ['.']
-        prepare_cache()
+        self._prepare()
+        # all files in the project root are read, so the index can forget other files there
+        self.whole_root = any(Path(path).resolve() == self.index.root for path in paths)
 
-        # `checkers` is list of checks to run (and then cache)
-        # check is a combination of plugin and file.
-        self.checkers = []
-        # `snapshots` is the list of checks that have cache and should not be run
-        self.snapshots = []
+        # The main process only enumerates files here.
+        # Reading, hashing, and cache lookup are done in `run` by threads,
+        # in parallel with checking files in workers.
+        self.files = []  # type: List[Tuple[str, Snapshot]]
         for argument in paths:
             for filename in filenames_from(argument, self.is_path_excluded):
-                # get checks list
-                selected_checks: Dict[str, List[Dict[str, Any]]]
-                selected_checks = dict(
-                    ast_plugins=[],
-                    logical_line_plugins=[],
-                    physical_line_plugins=[],
-                )
-                has_checks = False
-                for check_type, checks in self.checks.to_dictionary().items():
-                    for check in checks:
-                        should_process = self._should_process(
-                            argument=argument,
-                            filename=filename,
-                            check_type=check_type,
-                            check=check,
-                        )
-                        if not should_process:
-                            continue
-                        selected_checks[check_type].append(check)
-                        has_checks = True
-
-                # Create checker with selected checks
-                if not has_checks:
+                if not self._should_process(argument=argument, filename=filename):
                     continue
-                checker = FlakeHellFileChecker(
-                    filename=filename,
-                    checks=selected_checks,
-                    options=self.options,
-                )
-                # ignore files with top-level `# flake8: noqa`
-                if not checker.should_process:
+                if self.plan.checks_for(filename) is None:
                     continue
-                checker.snapshot = Snapshot.create(
-                    checker=checker,
+                self.files.append((filename, self._make_snapshot(filename)))
+
+        # Files are checked in any order but reported in the order they were found.
+        # `reorder` keeps checked files until all files before them are checked.
+        self.reorder = dict()  # type: Dict[int, Checked]
+        self.next_index = 0
+        # In streaming mode, don't look up and check files too far ahead of the first
+        # not reported file. So, the reorder buffer stays small. Otherwise, all results
+        # are kept until `report` anyway, and a slow file doesn't hold the files after it.
+        self.window = threading.Semaphore(REORDER_WINDOW)
+        self.lock = threading.Lock()
+        # In streaming mode, files are reported as soon as they are checked
+        # and then forgotten. Otherwise, they are kept until `report`.
+        self.checked = []  # type: List[Checked]
+        # Files that are checked by batch plugins have a few parts of results.
+        # The file is checked when all parts are received.
+        self.waiting = dict()  # type: Dict[int, int]
+        self.parts = defaultdict(list)  # type: Dict[int, List[FilteredResult]]
+        # Tasks are sent into checks when a part of files is looked up, the longest expected first.
+        self.ready = []  # type: List[AnyTask]
+        self.batch_size = max(1, min(BATCH_SIZE, ceil(len(self.files) / max(self.jobs, 1))))
+        self.results_found = self.results_reported = 0
+        self.files_checked = 0
+
+    def check_source(self, filename: str, source: bytes) -> Tuple[int, int]:
+        """Check and report the content of a file that isn't saved, like an editor buffer.
+
+        Results are cached by the content, as for files on disk.
+        Returns the number of found and reported results.
+        """
+        self._prepare()
+        self.files = []
+        self.results_found = self.results_reported = 0
+        if self.plan.checks_for(filename) is not None:
+            snapshot = self._make_snapshot(filename)
+            snapshot.set_source(source)
+            self.files.append((filename, snapshot))
+            ret = None  # type: Optional[FilteredResult]
+            if snapshot.missed:
+                [(_, ret)] = _run_task(Task(
+                    index=0,
+                    filename=filename,
+                    checks=self.plan.checks_for(filename, plugins=frozenset(snapshot.missed)),
                     options=self.options,
-                )
-                if checker.snapshot.exists():
-                    self.snapshots.append(checker)
-                    continue
-                self.checkers.append(checker)
+                    source=source,
+                    keys={plugin_name: snapshot.key(plugin_name) for plugin_name in snapshot.missed},
+                ))
+            self._report_file(Checked(index=0, ret=ret))
+        self.store.close()
+        self.index.close()
+        return (self.results_found, self.results_reported)
 
-    def _should_process(
-        self, argument: str, filename: str, check_type: str, check: Dict[str, Any],
-    ) -> bool:
-        # do not run plugins without rules specified
-        plugin_name = get_plugin_name(check)
-        rules = self._get_rules(plugin_name=plugin_name, filename=filename)
-        if not rules or set(rules) == {'-*'}:
+    def _prepare(self) -> None:
+        """Open the cache and resolve plugins, everything that doesn't depend on files.
+        """
+        self.store = get_cache_store(self.options, memory=self.memory)
+        # it is cheap when the cache is in the budget
+        self.store.prune(
+            max_size=self.options.cache_max_size * 2 ** 20,
+            max_age=self.options.cache_max_age * 3600 * 24,
+        )
+        self.index = FileIndex(path=CACHE_PATH, algorithm=self.options.cache_digest)
+
+        # `plan` resolves `plugins` and `exceptions` into selected checks for a file.
+        # Files that match the same exceptions share the same selected checks.
+        self.plan = ChecksPlan(
+            checks=self.checks.to_dictionary(),
+            plugins=self.options.plugins,
+            exceptions=self.options.exceptions,
+        )
+        # Every plugin has its own cache entry for a file.
+        # Fingerprints of plugins are the same for all files, calculate them once.
+        self.fingerprints = get_fingerprints(
+            plugins=self.checks.plugins.values(),
+            options=self.options,
+            groups=self.option_groups,
+        )
+        self.path_keys = get_path_keys(plugins=self.checks.plugins.values(), options=self.options)
+        # Batch plugins are run for many files at once, in separate tasks.
+        # Files that they can't check (stdin, non-Python files) are checked by them as usual.
+        self.batch_checks = getattr(self.checks, 'batch_plugins', [])
+        self.batch_names = frozenset(get_plugin_name(check) for check in self.batch_checks)
+        self.batches = {check['name']: [] for check in self.batch_checks}  # type: Dict[str, List[Tuple[int, str]]]
+        self.batch_costs = {check['name']: 0.0 for check in self.batch_checks}  # type: Dict[str, float]
+        # seconds to check one byte by every plugin, from recorded timings
+        self.rates = None  # type: Optional[Dict[str, float]]
+
+        global _CONTEXT
+        self.context = _CONTEXT = TaskContext(
+            store=self.store,
+            plan=self.plan,
+            options=self.options,
+            baseline=self.baseline,
+            diff=self.diff,
+            aggregate=self.aggregate,
+        )
+
+    def _make_snapshot(self, filename: str) -> Snapshot:
+        return Snapshot(
+            store=self.store,
+            index=self.index,
+            file_path=Path(filename).resolve(),
+            fingerprints={
+                plugin_name: self.fingerprints[plugin_name]
+                for plugin_name in self.plan.plugins_for(filename)
+            },
+            path_keys=self.path_keys,
+        )
+
+    def _job_count(self) -> int:
+        """Reloaded to not start more workers than CPUs available for the process.
+
+        In containers, the number of CPUs on the host can be much bigger than the CPU quota.
+        An explicitly passed number of jobs is used as is.
+        """
+        jobs = super()._job_count()
+        if jobs and self.options.jobs.is_auto:
+            return min(jobs, get_cpu_count())
+        return jobs
+
+    def run(self) -> None:
+        """Reloaded to decide on parallel run while files are looked up in cache.
+        """
+        try:
+            if self.jobs > 1 and len(self.files) > 1:
+                self.run_adaptive()
+            else:
+                self.run_serial()
+        except KeyboardInterrupt:
+            LOG.warning('Flake8 was interrupted by the user')
+            raise EarlyQuit('Early quit while running checks')
+
+    def run_adaptive(self) -> None:
+        """Check files in the main process until there is enough work for workers.
+
+        Usually, most of files have cache, and only a few files should be checked.
+        The pool is started only when files without cache are many or big enough,
+        and the rest of files is checked in it.
+
+        The work can be estimated only by recorded timings. So, if there are no timings yet,
+        like in a fresh checkout, or the number of jobs is passed explicitly,
+        the pool is started for the first file without cache.
+        """
+        max_cost, max_files = SERIAL_MAX_COST, SERIAL_MAX_FILES
+        if not self.options.jobs.is_auto or not self.index.timings:
+            max_cost, max_files = 0.0, 0
+        tasks = self._make_tasks()
+        cost = 0.0
+        files = 0
+        for task in tasks:
+            cost += task.cost
+            files += _count_files(task)
+            if cost > max_cost or files > max_files:
+                self.run_parallel(tasks=chain([task], tasks))
+                return
+            for index, ret in _run_task(task):
+                self._add_checked(index=index, ret=ret)
+
+    def run_serial(self, tasks: Iterable[AnyTask] = None) -> None:
+        if tasks is None:
+            tasks = self._make_tasks()
+        for task in tasks:
+            for index, ret in _run_task(task):
+                self._add_checked(index=index, ret=ret)
+
+    def run_parallel(self, tasks: Iterable[AnyTask] = None) -> None:
+        """Reloaded to start workers while files are looked up in cache.
+
+        Files are checked, parsed, and even the checker is created in workers.
+        The pool is forked before the tasks generator starts lookup threads,
+        or between its parts, so workers don't inherit locks held by the threads.
+        """
+        if tasks is None:
+            tasks = self._make_tasks()
+        pool = _try_initialize_processpool(self.jobs)
+        if pool is None:
+            self.run_serial(tasks=tasks)
+            return
+
+        pool_closed = False
+        try:
+            # The tasks generator is consumed by the pool in a separate thread,
+            # so workers are started while files are looked up.
+            # Tasks are sent one by one to not wait for a batch of them.
+            pool_map = pool.imap_unordered(_run_task, tasks, chunksize=1)
+            for checked in pool_map:
+                for index, ret in checked:
+                    self._add_checked(index=index, ret=ret)
+            pool.close()
+            pool.join()
+            pool_closed = True
+        finally:
+            if not pool_closed:
+                # unblock the tasks generator if it waits for the window
+                for _ in range(len(self.files)):
+                    self.window.release()
+                pool.terminate()
+                pool.join()
+
+    def _make_tasks(self) -> Iterator[AnyTask]:
+        """Look up files in cache and generate tasks for files that have plugins to run.
+
+        Files are looked up and sent by parts, so workers get the first tasks right away,
+        and only sources of one part are kept in memory. Before that, files are ordered
+        by recorded timings and sizes, the longest expected first, without reading them.
+        So, a big file doesn't hold the run at the end. In streaming mode,
+        files are looked up in the order they are reported, by parts of the reorder window.
+
+        No lookup threads are running when a task is generated,
+        so the process pool can be safely forked while the tasks are consumed.
+        """
+        order = list(range(len(self.files)))
+        if not self.options.streaming:
+            order.sort(key=self._expected_cost, reverse=True)
+        step = max(REORDER_WINDOW // 2, 1)
+        for start in range(0, len(order), step):
+            self._look_up(order[start:start + step])
+            if self.cancelled.is_set():
+                return
+            yield from self._flush()
+
+    def _expected_cost(self, index: int) -> float:
+        """Get expected seconds to check the file by all its plugins, as if there is no cache.
+        """
+        snapshot = self.files[index][1]
+        return sum(self._estimate(snapshot=snapshot, plugins=snapshot.fingerprints).values())
+
+    def _look_up(self, indices: List[int]) -> None:
+        """Get digests (read files if needed) and cached results in threads, and make tasks.
+        """
+        with ThreadPoolExecutor(max_workers=PREFETCH_THREADS) as executor:
+            prefetched = deque()  # type: Deque[Tuple[int, Future]]
+            for index in indices:
+                if self.cancelled.is_set():
+                    return
+                if self.options.streaming:
+                    # the files of the previous parts are already sent, they release the window
+                    self.window.acquire()
+                prefetched.append((index, executor.submit(getattr, self.files[index][1], 'missed')))
+                # wait for the oldest file only when there are enough files in progress
+                if len(prefetched) >= PREFETCH_THREADS * 2:
+                    self._make_task(*prefetched.popleft())
+            while prefetched:
+                if self.cancelled.is_set():
+                    return
+                self._make_task(*prefetched.popleft())
+
+    def cancel(self) -> None:
+        """Don't check files that aren't sent into checks yet.
+
+        It can be called from another thread while checks are running.
+        Files that are already sent are checked, but not all files get results.
+        """
+        self.cancelled.set()
+
+    def _make_task(self, index: int, missed: 'Future[Set[str]]') -> None:
+        filename, snapshot = self.files[index]
+        plugins = frozenset(missed.result())
+        if not plugins:
+            self._add_checked(index=index, ret=None)
+            return
+        costs = self._estimate(snapshot=snapshot, plugins=plugins)
+
+        batch_checks = []  # type: List[Dict[str, Any]]
+        if plugins & self.batch_names and self._can_batch(filename):
+            batch_checks = [
+                check for check in self.batch_checks
+                if get_plugin_name(check) in plugins
+            ]
+            plugins -= self.batch_names
+
+        # A big file can be checked by a few workers at once, every one runs a group of plugins.
+        groups = [plugins]
+        if self.options.split_files and self.jobs > 1:
+            groups = _split_plugins(
+                costs={plugin_name: costs[plugin_name] for plugin_name in plugins},
+                parts=self.jobs,
+            )
+        if len(batch_checks) + len(groups) > 1:
+            self.waiting[index] = len(batch_checks) + len(groups)
+
+        # Run only plugins that have no actual cache.
+        # The file is processed even if there are only batch plugins to run,
+        # to not report files with top-level `# flake8: noqa`.
+        # If the file was read to get the digest, the content is reused.
+        for group in groups:
+            self.ready.append(Task(
+                index=index,
+                filename=filename,
+                checks=self.plan.checks_for(filename, plugins=group) if group else None,
+                options=self.options,
+                source=snapshot.source,
+                cost=sum(costs[plugin_name] for plugin_name in group),
+                keys=self._get_keys(snapshot=snapshot, plugins=group),
+            ))
+        snapshot.source = None
+
+        for check in batch_checks:
+            batch = self.batches[check['name']]
+            batch.append((index, filename))
+            self.batch_costs[check['name']] += costs[get_plugin_name(check)]
+            if len(batch) >= self.batch_size:
+                self.ready.append(self._make_batch(check))
+
+    def _estimate(self, snapshot: Snapshot, plugins: Iterable[str]) -> Dict[str, float]:
+        """Get expected seconds to check the file by every plugin.
+
+        It is the time of the last check of the file, or, for new files,
+        the file size multiplied by the average time per byte for the plugin.
+        """
+        timings = self.index.timings.get(str(snapshot.file_path), {})
+        if self.rates is None:
+            self.rates = self.index.rates()
+        size = None  # type: Optional[int]
+        costs = dict()  # type: Dict[str, float]
+        for plugin_name in plugins:
+            cost = timings.get(plugin_name)
+            if cost is None:
+                if size is None:
+                    size = _get_size(snapshot)
+                cost = size * self.rates.get(plugin_name, DEFAULT_RATE)
+            costs[plugin_name] = cost
+        return costs
+
+    @staticmethod
+    def _get_keys(snapshot: Snapshot, plugins: Iterable[str]) -> Dict[str, str]:
+        """Get cache keys of plugins for the file, results for stdin aren't cached.
+        """
+        if snapshot.digest is None:
+            return dict()
+        return {plugin_name: snapshot.key(plugin_name) for plugin_name in plugins}
+
+    @staticmethod
+    def _can_batch(filename: str) -> bool:
+        """Batch plugins read files by themselves, so they can check only Python files.
+        """
+        if filename == '-':
             return False
+        return FlakeHellProcessor.get_parser(Path(filename)) is PythonParser
 
+    def _make_batch(self, check: Dict[str, Any]) -> BatchTask:
+        files, self.batches[check['name']] = self.batches[check['name']], []
+        cost, self.batch_costs[check['name']] = self.batch_costs[check['name']], 0.0
+        plugin_name = get_plugin_name(check)
+        keys = dict()  # type: Dict[int, str]
+        for index, _filename in files:
+            # the file isn't reported until the batch is checked, so the snapshot is here
+            snapshot = self.files[index][1]
+            if snapshot.digest is not None:
+                keys[index] = snapshot.key(plugin_name)
+        return BatchTask(check=check, files=files, options=self.options, cost=cost, keys=keys)
+
+    def _flush(self) -> Iterator[AnyTask]:
+        """Send all ready tasks, the longest expected first.
+
+        Small tasks are sent in chunks, so there are fewer messages between processes.
+        """
+        for check in self.batch_checks:
+            if self.batches[check['name']]:
+                self.ready.append(self._make_batch(check))
+        tasks, self.ready = self.ready, []
+        tasks.sort(key=lambda task: task.cost, reverse=True)
+
+        chunk = []  # type: List[Task]
+        chunk_cost = 0.0
+        for task in tasks:
+            if type(task) is not Task or task.cost >= CHUNK_COST:
+                yield task
+                continue
+            chunk.append(task)
+            chunk_cost += task.cost
+            if chunk_cost >= CHUNK_COST:
+                yield _make_chunk(chunk, cost=chunk_cost)
+                chunk = []
+                chunk_cost = 0.0
+        if chunk:
+            yield _make_chunk(chunk, cost=chunk_cost)
+
+    def _add_checked(self, index: int, ret: Optional[FilteredResult]) -> None:
+        """Put checked file into the reorder buffer and handle all files that are ready.
+
+        `ret` is None for files that have cache for all plugins.
+        It can be called from the main thread and from the tasks generator.
+        """
+        with self.lock:
+            waiting = self.waiting.pop(index, 1) - 1
+            if waiting:
+                self.waiting[index] = waiting
+                self.parts[index].append(ret)
+                return
+            if index in self.parts:
+                ret = _merge_results(self.parts.pop(index) + [ret])
+            self.reorder[index] = Checked(index=index, ret=ret)
+            while self.next_index in self.reorder:
+                checked = self.reorder.pop(self.next_index)
+                self.next_index += 1
+                if self.options.streaming:
+                    self.window.release()
+                if checked.ret is not None and checked.ret[1] is not None:
+                    self.files_checked += 1
+                    for name in STATISTIC_NAMES:
+                        self.statistics[name] += checked.ret[2][name]
+                if self.options.streaming:
+                    self._report_file(checked)
+                else:
+                    self.checked.append(checked)
+
+    def _should_process(self, argument: str, filename: str) -> bool:
         if filename == '-':
             return True
         if fnmatch(filename=filename, patterns=self.options.filename):
@@ -119,23 +713,6 @@ class FlakeHellCheckersManager(Manager):
             return False
         return argument == filename
 
-    def _get_rules(self, plugin_name: str, filename: str) -> List[str]:
-        rules = get_plugin_rules(
-            plugin_name=plugin_name,
-            plugins=self.options.plugins,
-        )
-        exceptions = get_exceptions(
-            path=filename,
-            exceptions=self.options.exceptions,
-        )
-        if exceptions:
-            rules = rules.copy()
-            rules += get_plugin_rules(
-                plugin_name=plugin_name,
-                plugins=exceptions,
-            )
-        return rules
-
     def is_path_excluded(self, filename: str) -> bool:
         """Patched `is_path_excluded`.
 
@@ -175,77 +752,75 @@ class FlakeHellCheckersManager(Manager):
         + use checker.filename as path instead of checker.display_name
         + pass checker into `_handle_results` to get plugin name.
         """
-        # self.run_serial()
-        results_reported = results_found = 0
-        for checker in self.checkers + self.snapshots:
-            if not checker.results and not checker.snapshot.exists():
-                continue
+        for checked in self.checked:
+            self._report_file(checked)
+        self.checked = []
+        self.store.close()
+        self.index.close(prune=self.whole_root and not self.cancelled.is_set())
+        return (self.results_found, self.results_reported)
 
-            # get results either from cache or actual run
-            if checker.snapshot.exists():
-                all_results = checker.snapshot.results
-            else:
-                all_results = sorted(
-                    checker.results, key=lambda tup: (tup[1], tup[2]))
-                checker.snapshot.dump(all_results)
-
-            # group results by plugin name
-            grouped_results = defaultdict(list)
-            for result in all_results:
-                if type(result) is not Result:
-                    if len(result) == 6:
-                        # cache entry is deserialized into list
-                        result = Result(*result)
-                    else:
-                        # flake8 sets custom error codes in a few places
-                        # where we didn't set `_processed_plugin`
-                        result = Result(DEFAULT_PLUGIN, *result)
-                grouped_results[result.plugin_name].append(result)
-
-            # get filename
-            filename = checker.filename
-            if filename is None or filename == '-':
-                filename = self.options.stdin_display_name or 'stdin'
-
-            with self.style_guide.processing_file(filename):
-                ignored = checker.processor.parser.ignore
-                for plugin_name, results in sorted(grouped_results.items()):
-                    results_reported += self._handle_results(
-                        filename=filename,
-                        results=results,
-                        plugin_name=plugin_name,
-                        ignored_codes=ignored.get(plugin_name, ()),
-                    )
-            results_found += len(all_results)
-        return (results_found, results_reported)
+    def _report_file(self, checked: Checked) -> None:
+        filename, snapshot = self.files[checked.index]
+        # forget the file, it's not needed anymore
+        self.files[checked.index] = (filename, None)
+        results = []  # type: List[Result]
+        counts = []  # type: List[List[Any]]
+        if checked.ret is not None:
+            if checked.ret[3] and snapshot.digest is not None:
+                self.index.set_timings(snapshot.file_path, checked.ret[3])
+            # ignore files with top-level `# flake8: noqa`
+            if checked.ret[1] is None:
+                return
+            results = [Result(*result) for result in decode_results(checked.ret[1])]
+            counts = list(decode_counts(checked.ret[1]))
+            self.results_found += checked.ret[4]
 
-    def _handle_results(
-        self, filename: str, results: list, plugin_name: str, ignored_codes: Tuple[str, ...],
-    ) -> int:
-        rules = self._get_rules(plugin_name=plugin_name, filename=filename)
-        reported_results_count = 0
-        for result in results:
-            # Some codes are ignored for a specific parser.
-            # For example, lack of blank lines for YAML parser.
-            if result.error_code in ignored_codes:
-                continue
+        # Results of the actual run are already cached and filtered in the task.
+        # Cached results are filtered here in the same way.
+        cached = [Result(*result) for result in snapshot.results]
+        self.results_found += len(cached)
+        cached_results, cached_counts = self.context.split(self.context.filter(filename, cached))
+        all_results = results + cached_results
+        all_counts = counts + cached_counts
+        if not all_results and not all_counts:
+            return
+        all_results.sort(key=lambda result: (result.error_code, result.line_number))
 
-            # skip baselined errors
-            if self.baseline:
-                digest = make_baseline(
-                    path=filename,
-                    context=result.line,
-                    code=result.error_code,
-                    line=result.line_number,
+        # group results by plugin name
+        grouped_results = defaultdict(list)  # type: Dict[str, List[Result]]
+        for result in all_results:
+            grouped_results[result.plugin_name].append(result)
+        grouped_counts = defaultdict(list)  # type: Dict[str, List[List[Any]]]
+        for row in all_counts:
+            grouped_counts[row[0]].append(row)
+
+        filename = self.context.get_display_name(filename)
+        with self.style_guide.processing_file(filename):
+            for plugin_name in sorted(set(grouped_results) | set(grouped_counts)):
+                self.results_reported += self._handle_results(
+                    filename=filename,
+                    results=grouped_results[plugin_name],
+                    plugin_name=plugin_name,
+                    counts=grouped_counts[plugin_name],
                 )
-                if digest in self.baseline:
-                    continue
 
-            # skip explicitly excluded codes
-            if not check_include(code=result.error_code, rules=rules):
-                continue
+    def _process_statistics(self) -> None:
+        """Reloaded because statistics are collected when files are reported.
+        """
+        self.statistics['files'] += self.files_checked
 
-            # report
+    def _handle_results(
+        self, filename: str, results: List[Result], plugin_name: str,
+        counts: Iterable[List[Any]] = (),
+    ) -> int:
+        # counted codes are reported in the order of codes, as if every result was reported
+        counts = sorted(counts, key=lambda row: row[1])
+        position = 0
+        reported_results_count = 0
+        for result in results:
+            while position < len(counts) and counts[position][1] < result.error_code:
+                reported_results_count += self._handle_count(filename=filename, row=counts[position])
+                position += 1
             reported_results_count += self.style_guide.handle_error(
                 code=result.error_code,
                 filename=filename,
@@ -255,19 +830,40 @@ class FlakeHellCheckersManager(Manager):
                 physical_line=result.line,
                 plugin=plugin_name,
             )
+        for row in counts[position:]:
+            reported_results_count += self._handle_count(filename=filename, row=row)
         return reported_results_count
 
+    def _handle_count(self, filename: str, row: List[Any]) -> int:
+        plugin_name, code, count, first_text, last_text = row
+        return self.style_guide.handle_count(
+            code=code,
+            filename=filename,
+            plugin=plugin_name,
+            count=count,
+            first_text=first_text,
+            last_text=last_text,
+        )
+
 
 class FlakeHellFileChecker(FileChecker):
     """
     A little bit patched FileChecker to support `--safe`
     """
-    snapshot: Snapshot
     _processed_plugin: str = DEFAULT_PLUGIN
 
+    def __init__(self, filename: str, checks: Dict[str, Any], options, source: bytes = None):
+        # content of the file if it's already read
+        self.source = source
+        # seconds spent by every plugin
+        self.timings = defaultdict(float)  # type: Dict[str, float]
+        super().__init__(filename=filename, checks=checks, options=options)
+        # the processor has parsed it, don't send it into workers
+        self.source = None
+
     def _make_processor(self) -> Optional[FlakeHellProcessor]:
         try:
-            return FlakeHellProcessor(self.filename, self.options)
+            return FlakeHellProcessor(self.filename, self.options, source=self.source)
         except IOError as e:
             message = '{0}: {1}'.format(type(e).__name__, e)
             self.report('E902', 0, 0, message)
@@ -288,9 +884,45 @@ class FlakeHellFileChecker(FileChecker):
                 raise
         return self.filename, self.results, self.statistics
 
+    def run_ast_checks(self) -> None:
+        """Copy-pasted `run_ast_checks` to measure the time of every plugin.
+
+        AST plugins do the work when results are iterated, not in `run_check`.
+        """
+        try:
+            ast = self.processor.build_ast()
+        except (ValueError, SyntaxError, TypeError) as e:
+            row, column = self._extract_syntax_information(e)
+            self.report('E999', row, column, '%s: %s' % (type(e).__name__, e.args[0]))
+            return
+
+        for plugin in self.checks['ast_plugins']:
+            start = perf_counter()
+            checker = self.run_check(plugin, tree=ast)
+            # If the plugin uses a class, call the run method of it, otherwise
+            # the call should return something iterable itself
+            try:
+                runner = checker.run()
+            except AttributeError:
+                runner = checker
+            for (line_number, offset, text, _) in runner:
+                self.report(
+                    error_code=None,
+                    line_number=line_number,
+                    column=offset,
+                    text=text,
+                )
+            self.timings[self._processed_plugin] += perf_counter() - start
+
     def run_check(self, plugin: Dict[str, Any], **arguments):
         self._processed_plugin = get_plugin_name(plugin)
-        return super().run_check(plugin=plugin, **arguments)
+        if 'tree' in arguments:
+            return super().run_check(plugin=plugin, **arguments)
+        start = perf_counter()
+        try:
+            return super().run_check(plugin=plugin, **arguments)
+        finally:
+            self.timings[self._processed_plugin] += perf_counter() - start
 
     def report(self, error_code: Optional[str], line_number: int, column: int, text: str) -> str:
         """
@@ -316,3 +948,171 @@ class FlakeHellFileChecker(FileChecker):
             line=line,
         ))
         return error_code
+
+
+def _run_checks(task: Task) -> CheckResult:
+    checker = FlakeHellFileChecker(
+        filename=task.filename,
+        checks=task.checks,
+        options=task.options,
+        source=task.source,
+    )
+    # files with top-level `# flake8: noqa` have no results
+    if not checker.should_process:
+        return checker.filename, None, checker.statistics, dict()
+    if task.checks is None:
+        return checker.filename, checker.results, checker.statistics, dict()
+    filename, results, statistics = checker.run_checks()
+    return filename, results, statistics, dict(checker.timings)
+
+
+def _run_batch(task: BatchTask) -> List[Tuple[int, CheckResult]]:
+    """Run a batch plugin and route its results to the checked files.
+    """
+    plugin_name = get_plugin_name(task.check)
+    filenames = [filename for _, filename in task.files]
+    results = {filename: [] for filename in filenames}  # type: Dict[str, List[Result]]
+    # plugins can report the path in another form
+    paths = {Path(filename).resolve(): filename for filename in filenames}
+    start = perf_counter()
+    try:
+        reported = task.check['plugin'].run_batch(filenames=filenames, options=task.options)
+        for path, line_number, column, text in reported:
+            filename = path if path in results else paths.get(Path(path).resolve())
+            if filename is None:
+                LOG.warning('%s reported unknown file: %s', plugin_name, path)
+                continue
+            error_code, text = text.split(' ', 1)
+            results[filename].append(Result(
+                plugin_name=plugin_name,
+                error_code=error_code,
+                line_number=line_number,
+                column=column,
+                text=text,
+                line=None,
+            ))
+    except Exception as exc:
+        if not task.options.safe:
+            raise
+        message = '{0}: {1}'.format(type(exc).__name__, exc)
+        for filename in filenames:
+            results[filename] = [Result(plugin_name, 'E902', 0, 0, message, None)]
+
+    # the plugin checks all files at once, its time is split between them
+    timings = {plugin_name: (perf_counter() - start) / len(filenames)}
+
+    # physical lines are used by `noqa` comments and baseline
+    checked = dict()  # type: Dict[str, Optional[List[Result]]]
+    for filename, file_results in results.items():
+        checked[filename] = file_results
+        if not file_results:
+            continue
+        lines = PythonParser.parse(path=Path(filename))
+        # ignore files with top-level `# flake8: noqa`, as the file checker does
+        if not task.options.disable_noqa and any(NOQA_FILE.match(line) for line in lines):
+            checked[filename] = None
+            continue
+        for position, result in enumerate(file_results):
+            if 0 < result.line_number <= len(lines):
+                file_results[position] = result._replace(line=lines[result.line_number - 1])
+    return [(index, (filename, checked[filename], dict(), timings)) for index, filename in task.files]
+
+
+def _get_size(snapshot: Snapshot) -> int:
+    if snapshot.source is not None:
+        return len(snapshot.source)
+    try:
+        return os.stat(str(snapshot.file_path)).st_size
+    except OSError:
+        return 0
+
+
+def _split_plugins(costs: Dict[str, float], parts: int) -> List[FrozenSet[str]]:
+    """Split plugins into groups with about the same expected time to run.
+
+    Plugins aren't split if they are expected to be fast,
+    or if the slowest plugin takes most of the time anyway.
+    """
+    total = sum(costs.values())
+    if len(costs) < 2 or total < SPLIT_MIN_COST:
+        return [frozenset(costs)]
+    # the longest processing time first
+    groups = [[] for _ in range(min(parts, len(costs)))]  # type: List[List[str]]
+    group_costs = [0.0] * len(groups)
+    for plugin_name in sorted(costs, key=lambda name: (-costs[name], name)):
+        position = group_costs.index(min(group_costs))
+        groups[position].append(plugin_name)
+        group_costs[position] += costs[plugin_name]
+    if max(group_costs) >= total:
+        return [frozenset(costs)]
+    return [frozenset(group) for group in groups if group]
+
+
+def _count_files(task: AnyTask) -> int:
+    if type(task) is ChunkTask:
+        return len(task.tasks)
+    if type(task) is BatchTask:
+        return len(task.files)
+    return 1
+
+
+def _make_chunk(tasks: List[Task], cost: float) -> Union[Task, ChunkTask]:
+    if len(tasks) == 1:
+        return tasks[0]
+    return ChunkTask(tasks=tasks, cost=cost)
+
+
+def _make_result(result) -> Result:
+    if type(result) is Result:
+        return result
+    # flake8 sets custom error codes in a few places
+    # where we didn't set `_processed_plugin`
+    return Result(DEFAULT_PLUGIN, *result)
+
+
+def _run_task(task: AnyTask) -> List[Tuple[int, FilteredResult]]:
+    """Run the task, save results into the cache, and leave only results to report.
+    """
+    checked = []  # type: List[Tuple[int, CheckResult, Mapping[str, str]]]
+    if type(task) is BatchTask:
+        plugin_name = get_plugin_name(task.check)
+        for index, ret in _run_batch(task):
+            keys = {plugin_name: task.keys[index]} if index in task.keys else dict()
+            checked.append((index, ret, keys))
+    else:
+        for subtask in (task.tasks if type(task) is ChunkTask else [task]):
+            checked.append((subtask.index, _run_checks(subtask), subtask.keys))
+    return [(index, _CONTEXT.finish(ret=ret, keys=keys)) for index, ret, keys in checked]
+
+
+def _merge_results(parts: List[FilteredResult]) -> FilteredResult:
+    """Merge results of a file from the file checker and batch plugins.
+    """
+    filename = parts[0][0]
+    # every file checker counts all lines and tokens of the file, batch plugins count nothing
+    statistics = {
+        name: max(part[2].get(name, 0) for part in parts)
+        for name in STATISTIC_NAMES
+    }
+    timings = dict()  # type: Dict[str, float]
+    for part in parts:
+        timings.update(part[3])
+    # ignore files with top-level `# flake8: noqa`
+    if any(part[1] is None for part in parts):
+        return filename, None, statistics, timings, 0
+    results = []  # type: List[List[Any]]
+    counts = []  # type: List[List[Any]]
+    found = sum(part[4] for part in parts)
+    # errors of reading and parsing the file are reported by every file checker
+    seen = set()  # type: Set[Tuple[Any, ...]]
+    for part in parts:
+        counts.extend(decode_counts(part[1]))
+        for result in decode_results(part[1]):
+            if result[1] in ALWAYS_INCLUDED:
+                key = tuple(result[1:5])
+                if key in seen:
+                    found -= 1
+                    continue
+                seen.add(key)
+            results.append(result)
+    return filename, encode_results(results, counts=merge_counts(counts)), statistics, timings, found
@@ -1,8 +1,20 @@
 # built-in
+import logging
 from collections import defaultdict
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
 
 # external
-from flake8.plugins.manager import Checkers, PluginManager
+from flake8._compat import importlib_metadata
+from flake8.plugins.manager import Checkers, Plugin, PluginManager
+
+# app
+from .._logic import PluginRegistry, get_plugin_name, get_plugin_rules
+from .._logic._plugin import PluginsType
+from .._logic._registry import EntryPointType
+
+
+LOG = logging.getLogger(__name__)
 
 
 class MultiDict:
@@ -27,6 +39,9 @@ class MultiDict:
     def __setitem__(self, name, value):
         self._data[name].append(value)
 
+    def remove(self, name, value) -> None:
+        self._data[name].remove(value)
+
     def items(self):
         for name, values in self._data.items():
             for value in values:
@@ -38,14 +53,85 @@ class MultiDict:
                 yield value
 
 
+class FlakeHellPlugin(Plugin):
+    """Plugin that knows its distribution and how long it takes to import.
+    """
+
+    def __init__(self, name, entry_point, local=False, dist: Tuple[str, str] = None):
+        super().__init__(name, entry_point, local=local)
+        # name and version of the distribution that provides the plugin
+        self.dist = dist
+        # seconds, the plugin module can be imported by another plugin before
+        self.load_time = 0.0
+
+    @property
+    def key(self) -> Optional[str]:
+        """Identity of the plugin in `PluginRegistry`.
+
+        None if the plugin can change without reinstalling, like local plugins.
+        """
+        if self.local or self.dist is None:
+            return None
+        return '{}=={}:{}={}'.format(self.dist[0], self.dist[1], self.name, self.entry_point.value)
+
+    def _load(self):
+        start = perf_counter()
+        try:
+            super()._load()
+        finally:
+            self.load_time = perf_counter() - start
+
+
 class FlakeHellPluginManager(PluginManager):
-    def __init__(self, namespace, local_plugins=None):
+    def __init__(self, namespace, local_plugins=None, registry: PluginRegistry = None):
         self.namespace = namespace
+        self.registry = registry
         self.plugins = MultiDict()
         self.names = []
         self._load_local_plugins(local_plugins or [])
         self._load_entrypoint_plugins()
 
+    def _load_entrypoint_plugins(self):
+        """Reloaded to know the distribution of every plugin without importing it.
+
+        Entry points are taken from the registry while installed distributions are the same.
+        """
+        entry_points = None
+        if self.registry is not None:
+            entry_points = self.registry.get_entry_points(self.namespace)
+        if entry_points is None:
+            entry_points = self._find_entry_points()
+            if self.registry is not None:
+                self.registry.set_entry_points(self.namespace, entry_points)
+
+        for name, value, dist_name, dist_version in entry_points:
+            if name == 'per-file-ignores':
+                LOG.warning(
+                    'flake8-per-file-ignores plugin is incompatible with '
+                    'flake8>=3.7 (which implements per-file-ignores itself).',
+                )
+                continue
+            entry_point = importlib_metadata.EntryPoint(name=name, value=value, group=self.namespace)
+            self._load_plugin_from_entrypoint(entry_point, dist=(dist_name, dist_version))
+
+    def _find_entry_points(self) -> List[EntryPointType]:
+        LOG.info('Loading entry-points for "%s".', self.namespace)
+        found = dict()  # type: Dict[Tuple[str, str], EntryPointType]
+        for dist in importlib_metadata.distributions():
+            for entry_point in dist.entry_points:
+                if entry_point.group != self.namespace:
+                    continue
+                # the same distribution can be found a few times on different paths
+                key = (entry_point.name, entry_point.value)
+                if key not in found:
+                    found[key] = [entry_point.name, entry_point.value, dist.metadata['Name'], dist.version]
+        return [found[key] for key in sorted(found)]
+
+    def _load_plugin_from_entrypoint(self, entry_point, local=False, dist: Tuple[str, str] = None):
+        name = entry_point.name
+        self.plugins[name] = FlakeHellPlugin(name, entry_point, local=local, dist=dist)
+        self.names.append(name)
+
     def map(self, func, *args, **kwargs):
         for plugin in self.plugins.values():
             yield func(plugin, *args, **kwargs)
@@ -61,9 +147,61 @@ class FlakeHellPluginManager(PluginManager):
 
 
 class FlakeHellCheckers(Checkers):
-    def __init__(self, local_plugins=None):
+    def __init__(self, local_plugins=None, registry: PluginRegistry = None):
+        self.registry = registry or PluginRegistry()
         self.manager = FlakeHellPluginManager(
             namespace=self.namespace,
             local_plugins=local_plugins,
+            registry=self.registry,
         )
+        self.registry.save()
         self.plugins_loaded = False
+        # plugins that aren't enabled by the config, they aren't imported
+        self.skipped = []  # type: List[FlakeHellPlugin]
+
+    def skip_disabled(self, plugins: PluginsType, exceptions: Dict[str, PluginsType]) -> None:
+        """Don't load plugins that aren't enabled by `plugins` and `exceptions` for any file.
+
+        Plugin names are taken from the registry, so disabled plugins aren't imported.
+        Plugins that aren't in the registry yet are imported once to get their names.
+        """
+        registry = self.registry
+        all_rules = [plugins] + list(exceptions.values())
+        for plugin in list(self.manager.plugins.values()):
+            key = plugin.key
+            name = registry.get(key) if key else None
+            if name is None:
+                name = get_plugin_name(plugin.to_dictionary())
+                if key:
+                    registry.set(key, name)
+            # the same check as in `ChecksPlan`, but for any file
+            if any(set(get_plugin_rules(name, rules)) - {'-*'} for rules in all_rules):
+                continue
+            self.manager.plugins.remove(plugin.name, plugin)
+            self.skipped.append(plugin)
+        registry.save()
+
+    def load_skipped(self, optmanager) -> None:
+        """Load and register options of skipped plugins.
+        """
+        for plugin in self.skipped:
+            self.manager.plugins[plugin.name] = plugin
+            plugin.load_plugin()
+            plugin.register_options(optmanager)
+            if plugin.group() is None and not plugin.off_by_default:
+                plugin.enable(optmanager)
+        self.skipped = []
+        # lists of plugins for every type are calculated only once
+        for attr in ('_ast_plugins', '_logical_line_plugins', '_physical_line_plugins'):
+            self.__dict__.pop(attr, None)
+
+    @property
+    def batch_plugins(self) -> List[Dict[str, Any]]:
+        """AST plugins that also can check a batch of files in one call.
+
+        Such plugins have `run_batch` classmethod, see "Batch plugins" in docs.
+        """
+        return [
+            plugin.to_dictionary() for plugin in self.ast_plugins
+            if callable(getattr(plugin.plugin, 'run_batch', None))
+        ]
@@ -1,6 +1,6 @@
 # built-in
 from pathlib import Path
-from typing import List, Type
+from typing import List, Optional, Type
 
 # external
 from flake8.processor import FileProcessor
@@ -12,8 +12,20 @@ from ..parsers import PARSERS, BaseParser, PythonParser
 class FlakeHellProcessor(FileProcessor):
     parser: Type[BaseParser] = PythonParser
 
+    def __init__(self, filename: str, options, lines: List[str] = None, source: bytes = None):
+        # content of the file if it's already read
+        self.source = source  # type: Optional[bytes]
+        super().__init__(filename, options, lines=lines)
+
+    @staticmethod
+    def get_parser(path: Path) -> Type[BaseParser]:
+        return PARSERS.get(path.suffix, PythonParser)
+
     def read_lines_from_filename(self) -> List[str]:
         """Read the lines for a file."""
         path = Path(self.filename)
-        self.parser = PARSERS.get(path.suffix, PythonParser)
-        return self.parser.parse(path=path)
+        self.parser = self.get_parser(path)
+        if self.source is None:
+            return self.parser.parse(path=path)
+        source, self.source = self.source, None
+        return self.parser.parse_source(source=source, path=path)
@@ -0,0 +1,247 @@
+# built-in
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from queue import Queue
+from types import MappingProxyType
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+# external
+from flake8.style_guide import Violation
+from flake8.utils import fnmatch
+
+# app
+from .._constants import NAME, VERSION
+from ._app import FlakeHellApplication
+
+
+# Lint a document only when it isn't changed for this time, in seconds.
+DEBOUNCE = 0.3
+
+# https://microsoft.github.io/language-server-protocol/specifications/specification-current/
+METHOD_NOT_FOUND = -32601
+SERVER_NOT_INITIALIZED = -32002
+TEXT_DOCUMENT_SYNC_FULL = 1
+SEVERITY_ERROR = 1
+SEVERITY_WARNING = 2
+
+Message = Dict[str, Any]
+
+LOG = logging.getLogger(__name__)
+
+
+def uri_to_path(uri: str) -> Path:
+    return Path(url2pathname(unquote(urlparse(uri).path)))
+
+
+def make_diagnostic(violation: Violation) -> Dict[str, Any]:
+    # positions in LSP are zero-based
+    line = max(violation.line_number - 1, 0)
+    character = max(violation.column_number - 1, 0)
+    end = character
+    if violation.physical_line:
+        end = max(end, len(violation.physical_line.rstrip('\r\n')))
+    return dict(
+        range=dict(
+            start=dict(line=line, character=character),
+            end=dict(line=line, character=end),
+        ),
+        severity=SEVERITY_ERROR if violation.code[0] in 'EF' else SEVERITY_WARNING,
+        code=violation.code,
+        source=NAME,
+        message=violation.text,
+    )
+
+
+class LanguageServer:
+    """Language Server Protocol server over stdio.
+
+    Open documents are checked from memory, with the same config, plugins, and cache
+    as `lint`. Only full text synchronization is supported.
+
+    Messages are read in the main thread, and documents are checked one by one
+    in the worker thread. A document is checked when it isn't changed for `DEBOUNCE` seconds.
+    Checks of an outdated version of a document are skipped, and their results are dropped.
+    """
+
+    def __init__(self, stdin: BinaryIO, stdout: BinaryIO, argv: List[str]) -> None:
+        self.stdin = stdin
+        self.stdout = stdout
+        self.argv = argv
+        self.app = None  # type: Optional[FlakeHellApplication]
+        # version and text of every open document
+        self.documents = dict()  # type: Dict[str, Tuple[int, str]]
+        self.timers = dict()  # type: Dict[str, threading.Timer]
+        # documents to check, with the version that should be checked
+        self.queue = Queue()  # type: Queue[Tuple[str, int]]
+        self.reported = []  # type: List[Violation]
+        self._lock = threading.Lock()
+
+    def run(self) -> None:
+        """Handle messages until `exit` notification or the end of the input.
+        """
+        worker = threading.Thread(target=self._check_forever, daemon=True)
+        worker.start()
+        while True:
+            message = self._read()
+            if message is None or message.get('method') == 'exit':
+                return
+            handler_name = HANDLERS.get(message.get('method'))
+            if handler_name is None:
+                if 'id' in message:
+                    self._send(id=message['id'], error=dict(
+                        code=METHOD_NOT_FOUND,
+                        message='method not found: {}'.format(message.get('method')),
+                    ))
+                continue
+            if self.app is None and message['method'] != 'initialize':
+                if 'id' in message:
+                    self._send(id=message['id'], error=dict(
+                        code=SERVER_NOT_INITIALIZED,
+                        message='server is not initialized',
+                    ))
+                continue
+            result = getattr(self, handler_name)(message.get('params') or dict())
+            if 'id' in message:
+                self._send(id=message['id'], result=result)
+
+    # protocol
+
+    def _read(self) -> Optional[Message]:
+        length = None
+        while True:
+            line = self.stdin.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode('ascii').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        if length is None:
+            return None
+        return json.loads(self.stdin.read(length).decode('utf8'))
+
+    def _send(self, **message) -> None:
+        message['jsonrpc'] = '2.0'
+        body = json.dumps(message).encode('utf8')
+        header = 'Content-Length: {}\r\n\r\n'.format(len(body)).encode('ascii')
+        with self._lock:
+            self.stdout.write(header + body)
+            self.stdout.flush()
+
+    # handlers
+
+    def _initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        # the config is looked up from the current directory
+        if params.get('rootUri'):
+            os.chdir(str(uri_to_path(params['rootUri'])))
+        elif params.get('rootPath'):
+            os.chdir(params['rootPath'])
+        self.app = FlakeHellApplication(program=NAME, version=VERSION)
+        self.app.initialize(self.argv)
+        self.app.formatter.handle = self.reported.append
+        self.app.file_checker_manager.aggregate = False
+        return dict(
+            capabilities=dict(textDocumentSync=dict(
+                openClose=True,
+                change=TEXT_DOCUMENT_SYNC_FULL,
+                save=True,
+            )),
+            serverInfo=dict(name=NAME, version=VERSION),
+        )
+
+    def _ignore(self, params: Dict[str, Any]) -> None:
+        return None
+
+    def _did_open(self, params: Dict[str, Any]) -> None:
+        document = params['textDocument']
+        self.documents[document['uri']] = (document['version'], document['text'])
+        self._schedule(uri=document['uri'], delay=0)
+
+    def _did_change(self, params: Dict[str, Any]) -> None:
+        uri = params['textDocument']['uri']
+        if uri not in self.documents or not params['contentChanges']:
+            return
+        # full synchronization, the last change has the whole text
+        text = params['contentChanges'][-1]['text']
+        self.documents[uri] = (params['textDocument']['version'], text)
+        self._schedule(uri=uri, delay=DEBOUNCE)
+
+    def _did_save(self, params: Dict[str, Any]) -> None:
+        uri = params['textDocument']['uri']
+        if uri in self.documents:
+            self._schedule(uri=uri, delay=0)
+
+    def _did_close(self, params: Dict[str, Any]) -> None:
+        uri = params['textDocument']['uri']
+        self.documents.pop(uri, None)
+        timer = self.timers.pop(uri, None)
+        if timer is not None:
+            timer.cancel()
+        self._send(method='textDocument/publishDiagnostics', params=dict(uri=uri, diagnostics=[]))
+
+    # checks
+
+    def _schedule(self, uri: str, delay: float) -> None:
+        timer = self.timers.pop(uri, None)
+        if timer is not None:
+            timer.cancel()
+        version = self.documents[uri][0]
+        timer = threading.Timer(delay, self.queue.put, args=((uri, version), ))
+        timer.daemon = True
+        self.timers[uri] = timer
+        timer.start()
+
+    def _is_actual(self, uri: str, version: int) -> bool:
+        document = self.documents.get(uri)
+        return document is not None and document[0] == version
+
+    def _check_forever(self) -> None:
+        while True:
+            uri, version = self.queue.get()
+            # a newer version is already scheduled
+            if not self._is_actual(uri=uri, version=version):
+                continue
+            try:
+                diagnostics = self._check(uri=uri, text=self.documents[uri][1])
+            except Exception:
+                LOG.exception('cannot check %s', uri)
+                continue
+            # the document was changed or closed while it was checked
+            if not self._is_actual(uri=uri, version=version):
+                continue
+            self._send(method='textDocument/publishDiagnostics', params=dict(
+                uri=uri,
+                version=version,
+                diagnostics=diagnostics,
+            ))
+
+    def _check(self, uri: str, text: str) -> List[Dict[str, Any]]:
+        manager = self.app.file_checker_manager
+        # paths are relative to the root, as for `lint` run in the root,
+        # so `exceptions` from the config are matched in the same way
+        filename = os.path.relpath(str(uri_to_path(uri)))
+        if not fnmatch(filename=filename, patterns=self.app.options.filename):
+            return []
+        if manager.is_path_excluded(filename):
+            return []
+        del self.reported[:]
+        manager.check_source(filename=filename, source=text.encode('utf8'))
+        return [make_diagnostic(violation) for violation in self.reported]
+
+
+HANDLERS = MappingProxyType({
+    'initialize': '_initialize',
+    'initialized': '_ignore',
+    'shutdown': '_ignore',
+    'textDocument/didOpen': '_did_open',
+    'textDocument/didChange': '_did_change',
+    'textDocument/didSave': '_did_save',
+    'textDocument/didClose': '_did_close',
+})
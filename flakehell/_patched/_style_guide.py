@@ -2,6 +2,7 @@
 from functools import lru_cache
 
 # external
+from flake8.statistics import Key, Statistic
 from flake8.style_guide import StyleGuide, StyleGuideManager
 
 # app
@@ -58,6 +59,30 @@ class FlakeHellStyleGuideManager(StyleGuideManager):
             params['plugin'] = plugin
         return guide.handle_error(**params)
 
+    def handle_count(
+        self,
+        code: str,
+        filename: str,
+        plugin: str,
+        count: int,
+        first_text: str,
+        last_text: str,
+    ) -> int:
+        """Report a few violations of the same code in the file at once.
+
+        It is used when the formatter needs only counts of violations.
+        Violations are already filtered, including `noqa` and `--diff`.
+        Statistics keep the text of the first violation, as `Statistics.record` does.
+        """
+        key = Key(filename=filename, code=code)
+        statistic = self.stats._store.get(key)
+        if statistic is None:
+            statistic = Statistic(error_code=code, filename=filename, message=first_text, count=0)
+            self.stats._store[key] = statistic
+        statistic.count += count
+        self.formatter.handle_count(code=code, plugin=plugin, text=last_text, count=count)
+        return count
+
 
 class FlakeHellStyleGuide(StyleGuide):
     def handle_error(
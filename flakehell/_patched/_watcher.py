@@ -0,0 +1,198 @@
+# built-in
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# external
+from flake8.style_guide import Violation
+from flake8.utils import filenames_from
+
+# app
+from .._logic import colored
+
+
+if TYPE_CHECKING:
+    from ._app import FlakeHellApplication
+
+
+# How often to look for changes, in seconds.
+POLL_INTERVAL = 0.5
+# Check changed files only when there are no new changes for this time, in seconds.
+# So, a few saves in a row, like formatting on save, are checked once.
+DEBOUNCE = 0.2
+
+# modification time and size of a file
+FileState = Tuple[int, int]
+
+
+def _get_state(filename: str) -> Optional[FileState]:
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get_key(violation: Violation) -> Hashable:
+    """Violations are compared by the line content, not the line number.
+
+    So, violations below a changed line aren't reported again.
+    """
+    line = violation.physical_line
+    if line is None:
+        return violation.code, violation.text, violation.line_number
+    return violation.code, violation.text, line.strip()
+
+
+class Watcher:
+    """Check files again when they are changed and report only new and resolved violations.
+
+    Files are found by polling, and only changed files are checked again.
+    A run is cancelled if a file is changed while it is checked.
+    """
+
+    def __init__(self, app: 'FlakeHellApplication') -> None:
+        self.app = app
+        self.manager = app.file_checker_manager
+        # violations are compared one by one
+        self.manager.aggregate = False
+        self.formatter = app.formatter
+        self.states = dict()  # type: Dict[str, FileState]
+        # reported violations for every file
+        self.violations = dict()  # type: Dict[str, List[Violation]]
+        # files of a cancelled run that should be checked again
+        self.pending = set()  # type: Set[str]
+
+    def run(self) -> None:
+        self.formatter.start()
+        try:
+            self.states = self._scan()
+            changed = set(self.states)
+            while True:
+                self._check(changed)
+                changed = self._wait_for_changes()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.formatter.stop()
+
+    def _scan(self) -> Dict[str, FileState]:
+        """Find all files that should be checked and get their current state.
+        """
+        states = dict()  # type: Dict[str, FileState]
+        for argument in self.manager.arguments or ['.']:
+            for filename in filenames_from(argument, self.manager.is_path_excluded):
+                if filename == '-':
+                    continue
+                if not self.manager._should_process(argument=argument, filename=filename):
+                    continue
+                state = _get_state(filename)
+                if state is not None:
+                    states[filename] = state
+        return states
+
+    def _wait_for_changes(self) -> Set[str]:
+        changed = self.pending
+        self.pending = set()
+        while True:
+            time.sleep(DEBOUNCE if changed else POLL_INTERVAL)
+            states = self._scan()
+            new_changes = {
+                filename for filename in set(states) | set(self.states)
+                if states.get(filename) != self.states.get(filename)
+            }
+            self.states = states
+            if new_changes:
+                changed |= new_changes
+                continue
+            if changed:
+                return changed
+
+    def _check(self, filenames: Set[str]) -> None:
+        # removed files have no violations anymore
+        files = sorted(filename for filename in filenames if filename in self.states)
+        reported = defaultdict(list)  # type: Dict[str, List[Violation]]
+        if files:
+            if not self._run(files=files, reported=reported):
+                self.pending.update(filenames)
+                return
+
+        counts = [0, 0]
+        for filename in sorted(filenames):
+            new, resolved = self._diff(
+                old=self.violations.pop(filename, []),
+                actual=reported[filename],
+            )
+            for violation in new:
+                self.formatter.handle(violation)
+            for violation in resolved:
+                self.formatter.write('{} {}:{}:{}: {} {}'.format(
+                    colored('resolved', 'green'),
+                    violation.filename,
+                    violation.line_number,
+                    violation.column_number,
+                    violation.code,
+                    violation.text,
+                ), None)
+            if reported[filename]:
+                self.violations[filename] = reported[filename]
+            counts[0] += len(new)
+            counts[1] += len(resolved)
+        self.formatter.write(colored('{} new, {} resolved, {} total'.format(
+            counts[0], counts[1], sum(len(violations) for violations in self.violations.values()),
+        ), 'white', attrs=['bold']), None)
+
+    def _run(self, files: List[str], reported: Dict[str, List[Violation]]) -> bool:
+        """Check files in a thread and collect reported violations.
+
+        Returns False if the run is cancelled because a file was changed again.
+        """
+        errors = []  # type: List[BaseException]
+
+        def target() -> None:
+            try:
+                self.app.run_checks(files)
+                self.app.report_errors()
+            except BaseException as exc:
+                errors.append(exc)
+
+        self.manager.cancelled.clear()
+        self.formatter.handle = lambda error: reported[error.filename].append(error)
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        try:
+            while thread.is_alive():
+                thread.join(POLL_INTERVAL)
+                if any(_get_state(filename) != self.states[filename] for filename in files):
+                    self.manager.cancel()
+        finally:
+            del self.formatter.handle
+        if errors:
+            raise errors[0]
+        return not self.manager.cancelled.is_set()
+
+    @staticmethod
+    def _diff(
+        old: Iterable[Violation], actual: Iterable[Violation],
+    ) -> Tuple[List[Violation], List[Violation]]:
+        """Get new and resolved violations.
+        """
+        old_keys = Counter(_get_key(violation) for violation in old)
+        actual_keys = Counter(_get_key(violation) for violation in actual)
+        new = []
+        added = actual_keys - old_keys
+        for violation in actual:
+            key = _get_key(violation)
+            if added[key]:
+                added[key] -= 1
+                new.append(violation)
+        resolved = []
+        removed = old_keys - actual_keys
+        for violation in old:
+            key = _get_key(violation)
+            if removed[key]:
+                removed[key] -= 1
+                resolved.append(violation)
+        return new, resolved
@@ -1,11 +1,17 @@
 # built-in
 from types import MappingProxyType
 
+# Commands import flake8 application and plugins only when they are called,
+# so commands that don't need it, like `--version` and `codes`, start fast.
+
 # app
 from ._baseline import baseline_command
+from ._cache import cache_command
 from ._code import code_command
 from ._codes import codes_command
+from ._daemon import daemon_command
 from ._lint import lint_command
+from ._lsp import lsp_command
 from ._missed import missed_command
 from ._plugins import plugins_command
 from ._version import version_command
@@ -15,9 +21,12 @@ __all__ = [
     'COMMANDS',
 
     'baseline_command',
+    'cache_command',
     'code_command',
     'codes_command',
+    'daemon_command',
     'lint_command',
+    'lsp_command',
     'missed_command',
     'plugins_command',
     'version_command',
@@ -26,9 +35,12 @@ __all__ = [
 
 COMMANDS = MappingProxyType({
     'baseline': baseline_command,
+    'cache': cache_command,
     'code': code_command,
     'codes': codes_command,
+    'daemon': daemon_command,
     'lint': lint_command,
+    'lsp': lsp_command,
     'missed': missed_command,
     'plugins': plugins_command,
     '--version': version_command,
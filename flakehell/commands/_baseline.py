@@ -3,14 +3,15 @@ from types import SimpleNamespace
 
 # app
 from .._constants import NAME, VERSION
-from .._patched import FlakeHellApplication
 from .._types import CommandResult
-from ..formatters import BaseLineFormatter
 
 
 def baseline_command(argv) -> CommandResult:
     """Generate baseline that can be used later to ignore errors.
     """
+    from .._patched import FlakeHellApplication
+    from ..formatters import BaseLineFormatter
+
     app = FlakeHellApplication(program=NAME, version=VERSION)
     app.formatter = BaseLineFormatter(SimpleNamespace(
         output_file=None,
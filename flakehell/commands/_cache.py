@@ -0,0 +1,60 @@
+# built-in
+from time import time
+
+# app
+from .._constants import NAME, VERSION, ExitCode
+from .._logic import CACHE_PATH, FileIndex, colored, get_cache_store
+from .._types import CommandResult
+
+
+ACTIONS = ('info', 'prune', 'clear')
+
+
+def cache_command(argv) -> CommandResult:
+    """Show cache usage (info), evict cache out of the budget (prune), or remove all cache (clear).
+    """
+    if argv and argv[0] == '--help':
+        print(cache_command.__doc__)
+        return ExitCode.OK, ''
+    if not argv:
+        return ExitCode.NOT_ENOUGH_ARGS, 'specify action: {}'.format(', '.join(ACTIONS))
+    action, *argv = argv
+    if action not in ACTIONS:
+        return ExitCode.INVALID_COMMAND, 'invalid action: {}'.format(action)
+
+    from .._patched import FlakeHellApplication
+
+    app = FlakeHellApplication(program=NAME, version=VERSION)
+    app.initialize(argv)
+    options = app.options
+    store = get_cache_store(options)
+
+    if action == 'prune':
+        count = store.prune(
+            max_size=options.cache_max_size * 2 ** 20,
+            max_age=options.cache_max_age * 3600 * 24,
+        )
+        print('removed', colored(str(count), 'green'), 'entries')
+        # the index isn't shared, it keeps entries for files of all projects on the machine
+        index = FileIndex(path=CACHE_PATH)
+        count = index.prune()
+        index.close()
+        print('forgot', colored(str(count), 'green'), 'removed files')
+    elif action == 'clear':
+        count = store.clear()
+        FileIndex(path=CACHE_PATH).clear()
+        print('removed', colored(str(count), 'green'), 'entries')
+    else:
+        usage = store.usage()
+        print('path   ', colored(str(store.path), 'green'))
+        print('backend', colored(options.cache_backend, 'green'))
+        print('entries', colored(str(usage.count), 'green'))
+        print('size   ', colored('{:.1f} / {} MB'.format(
+            usage.size / 2 ** 20, options.cache_max_size,
+        ), 'green'))
+        if usage.oldest is not None:
+            print('oldest ', colored('{:.1f} / {} days'.format(
+                (time() - usage.oldest) / (3600 * 24), options.cache_max_age,
+            ), 'green'))
+    store.close()
+    return ExitCode.OK, ''
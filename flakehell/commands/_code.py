@@ -1,7 +1,6 @@
 # app
 from .._constants import NAME, VERSION, ExitCode
 from .._logic import color_description, colored, extract, get_installed
-from .._patched import FlakeHellApplication
 from .._types import CommandResult
 
 
@@ -17,6 +16,8 @@ def code_command(argv) -> CommandResult:
         return ExitCode.TOO_MANY_ARGS, 'the command accept only one argument'
     code = argv[0]
 
+    from .._patched import FlakeHellApplication
+
     app = FlakeHellApplication(program=NAME, version=VERSION)
     plugins = sorted(get_installed(app=app), key=lambda p: p['name'])
     if not plugins:
@@ -0,0 +1,147 @@
+# built-in
+import os
+import socket
+import sys
+import traceback
+from collections import OrderedDict
+from contextlib import redirect_stderr, redirect_stdout
+from io import BytesIO, TextIOWrapper
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, TextIO, Tuple
+
+# app
+from .._constants import NAME, VERSION, ExitCode
+from .._logic import SOCKET_PATH, Output, colored, connect, decode_stdin, receive, send
+from .._types import CommandResult
+from ._lint import run_lint
+
+
+if TYPE_CHECKING:
+    from .._patched import FlakeHellApplication
+
+
+ACTIONS = ('start', 'stop')
+# initialized app for every directory and config, with the config modification time
+AppsType = Dict[Tuple[str, str], Tuple[Optional[int], 'FlakeHellApplication']]
+
+
+def daemon_command(argv) -> CommandResult:
+    """Run daemon that keeps plugins and cache loaded for `lint --daemon` (start), or stop it (stop).
+    """
+    if argv and argv[0] == '--help':
+        print(daemon_command.__doc__)
+        return ExitCode.OK, ''
+    if not argv:
+        return ExitCode.NOT_ENOUGH_ARGS, 'specify action: {}'.format(', '.join(ACTIONS))
+    action, *argv = argv
+    if action not in ACTIONS:
+        return ExitCode.INVALID_COMMAND, 'invalid action: {}'.format(action)
+    if not hasattr(socket, 'AF_UNIX'):
+        return ExitCode.INVALID_COMMAND, 'the daemon requires Unix sockets'
+
+    client = connect()
+    if action == 'stop':
+        if client is None:
+            return ExitCode.DAEMON_NOT_RUNNING, 'the daemon is not running'
+        with client, client.makefile('rw', encoding='utf8') as stream:
+            send(stream, stop=True)
+            receive(stream)
+        return ExitCode.OK, ''
+
+    if client is not None:
+        client.close()
+        return ExitCode.DAEMON_RUNNING, 'the daemon is already running'
+    # left by a killed daemon
+    if SOCKET_PATH.exists():
+        SOCKET_PATH.unlink()
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    # cached results of all runs, so unchanged files are never read from disk
+    memory = OrderedDict()  # type: OrderedDict[str, Any]
+    # import plugins and formatters before the first run
+    apps = dict()  # type: AppsType
+    _get_app(apps=apps, argv=argv, memory=memory).initialize(argv)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(SOCKET_PATH))
+    server.listen()
+    print('listening on', colored(str(SOCKET_PATH), 'green'))
+    try:
+        _serve(server, apps=apps, memory=memory)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        SOCKET_PATH.unlink()
+    return ExitCode.OK, ''
+
+
+def _serve(server: socket.socket, apps: AppsType, memory: 'OrderedDict[str, Any]') -> None:
+    """Handle requests one by one until `stop` request.
+
+    Every run changes the current directory and the standard streams,
+    so runs can't be done in parallel. Checks of a run are still done in parallel.
+    """
+    while True:
+        connection, _ = server.accept()
+        with connection, connection.makefile('rw', encoding='utf8') as stream:
+            request = receive(stream)
+            if request is None:
+                continue
+            if request.get('stop'):
+                send(stream, exit_code=ExitCode.OK, error='')
+                return
+            exit_code, error = _run(request=request, stream=stream, apps=apps, memory=memory)
+            try:
+                send(stream, exit_code=int(exit_code), error=error)
+            except OSError:
+                # the client has gone
+                continue
+
+
+def _get_app(apps: AppsType, argv: List[str], memory: 'OrderedDict[str, Any]') -> 'FlakeHellApplication':
+    """Get the app for the current directory and config, plugins are found only once for them.
+
+    The config enables plugins, so a new app is made when the config is changed.
+    """
+    from .._patched import FlakeHellApplication
+
+    config_path, _ = FlakeHellApplication.extract_toml_config_path(argv)
+    if config_path is None:
+        config_path = FlakeHellApplication.find_toml_config()
+    mtime = None
+    if config_path is not None:
+        try:
+            mtime = config_path.stat().st_mtime_ns
+        except OSError:
+            pass
+    key = (os.getcwd(), str(config_path))
+    if key in apps and apps[key][0] == mtime:
+        return apps[key][1]
+    app = FlakeHellApplication(program=NAME, version=VERSION)
+    app.memory = memory
+    apps[key] = (mtime, app)
+    return app
+
+
+def _run(
+    request: Dict[str, Any], stream: TextIO, apps: AppsType, memory: 'OrderedDict[str, Any]',
+) -> CommandResult:
+    from flake8.utils import stdin_get_value
+
+    cwd = os.getcwd()
+    stdin = sys.stdin
+    try:
+        os.chdir(request['cwd'])
+        # flake8 keeps stdin of the previous run
+        stdin_get_value.cache_clear()
+        if request['stdin'] is not None:
+            sys.stdin = TextIOWrapper(BytesIO(decode_stdin(request['stdin'])))
+        with redirect_stdout(Output(stream, name='stdout', tty=request.get('tty', False))):
+            with redirect_stderr(Output(stream, name='stderr')):
+                app = _get_app(apps=apps, argv=request['argv'], memory=memory)
+                return run_lint(request['argv'], app=app)
+    except Exception:
+        return 1, traceback.format_exc()
+    finally:
+        os.chdir(cwd)
+        sys.stdin = stdin
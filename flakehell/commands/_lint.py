@@ -1,16 +1,54 @@
+# built-in
+from typing import TYPE_CHECKING
+
 # app
-from .._constants import NAME, VERSION
-from .._patched import FlakeHellApplication
+from .._constants import NAME, VERSION, ExitCode
+from .._logic import forward
 from .._types import CommandResult
 
 
+if TYPE_CHECKING:
+    from .._patched import FlakeHellApplication
+
+
 def lint_command(argv) -> CommandResult:
     """Run patched flake8 against the code.
     """
-    app = FlakeHellApplication(program=NAME, version=VERSION)
+    if '--watch' in argv:
+        return watch_lint([arg for arg in argv if arg != '--watch'])
+    # run in the daemon if it is running, see `daemon` command
+    if '--daemon' in argv:
+        argv = [arg for arg in argv if arg != '--daemon']
+        result = forward(argv)
+        if result is not None:
+            return result
+    return run_lint(argv)
+
+
+def run_lint(argv, app: 'FlakeHellApplication' = None) -> CommandResult:
+    """Run the app, an already initialized app is initialized again with new arguments.
+    """
+    if app is None:
+        from .._patched import FlakeHellApplication
+
+        app = FlakeHellApplication(program=NAME, version=VERSION)
     try:
         app.run(argv)
         app.exit()
     except SystemExit as exc:
         return int(exc.code), ''
     raise RuntimeError('unreachable')
+
+
+def watch_lint(argv) -> CommandResult:
+    """Check files again when they are changed, until interrupted.
+    """
+    from .._patched import FlakeHellApplication, Watcher
+
+    app = FlakeHellApplication(program=NAME, version=VERSION)
+    try:
+        app.initialize(argv)
+    except SystemExit as exc:
+        return int(exc.code), ''
+    Watcher(app).run()
+    return ExitCode.OK, ''
@@ -0,0 +1,24 @@
+# built-in
+import sys
+
+# app
+from .._constants import ExitCode
+from .._types import CommandResult
+
+
+def lsp_command(argv) -> CommandResult:
+    """Run Language Server Protocol server over stdio for editors.
+    """
+    if argv and argv[0] == '--help':
+        print(lsp_command.__doc__)
+        return ExitCode.OK, ''
+    from .._patched import LanguageServer
+
+    stdout = sys.stdout
+    # stdout is used for messages, everything that plugins print goes to stderr
+    sys.stdout = sys.stderr
+    try:
+        LanguageServer(stdin=sys.stdin.buffer, stdout=stdout.buffer, argv=argv).run()
+    finally:
+        sys.stdout = stdout
+    return ExitCode.OK, ''
@@ -1,7 +1,6 @@
 # app
 from .._constants import NAME, VERSION, ExitCode
 from .._logic import get_installed, get_plugin_rules
-from .._patched import FlakeHellApplication
 from .._types import CommandResult
 
 
@@ -14,6 +13,8 @@ def missed_command(argv) -> CommandResult:
     if argv:
         return ExitCode.TOO_MANY_ARGS, 'the command does not accept arguments'
 
+    from .._patched import FlakeHellApplication
+
     app = FlakeHellApplication(program=NAME, version=VERSION)
     installed_plugins = sorted(get_installed(app=app), key=lambda p: p['name'])
     if not installed_plugins:
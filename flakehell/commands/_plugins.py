@@ -1,15 +1,19 @@
 # app
 from .._constants import NAME, VERSION, ExitCode
 from .._logic import colored, get_installed, get_plugin_rules
-from .._patched import FlakeHellApplication
 from .._types import CommandResult
 
 
 def plugins_command(argv) -> CommandResult:
     """Show all installed plugins, their codes prefix, and matched rules from config.
+
+    Pass `--import-times` to also show how long it takes to import every plugin.
     """
+    import_times = '--import-times' in argv
+    from .._patched import FlakeHellApplication
+
     app = FlakeHellApplication(program=NAME, version=VERSION)
-    plugins = sorted(get_installed(app=app), key=lambda p: p['name'])
+    plugins = sorted(get_installed(app=app, cached=not import_times), key=lambda p: p['name'])
     if not plugins:
         return ExitCode.NO_PLUGINS_INSTALLED, 'no plugins installed'
 
@@ -17,9 +21,12 @@ def plugins_command(argv) -> CommandResult:
     version_width = max(8, max(len(p['version']) for p in plugins))
     codes_width = max(6, max(len('  '.join(p['codes'])) for p in plugins))
     template = '{name} | {version} | {codes} | {rules}'
+    if import_times:
+        template = '{name} | {version} | {import_time} | {codes} | {rules}'
     print(template.format(
         name=colored('NAME'.ljust(name_width), 'yellow'),
         version=colored('VERSION'.ljust(version_width), 'yellow'),
+        import_time=colored('IMPORT'.ljust(9), 'yellow'),
         codes=colored('CODES'.ljust(codes_width), 'yellow'),
         rules=colored('RULES', 'yellow'),
     ))
@@ -46,6 +53,7 @@ def plugins_command(argv) -> CommandResult:
         print(template.format(
             name=colored(plugin['name'].ljust(name_width), color),
             version=plugin['version'].ljust(version_width),
+            import_time='{:.1f} ms'.format(plugin.get('import_time', 0.0) * 1000).rjust(9),
             codes=', '.join(plugin['codes']).ljust(codes_width),
             rules=', '.join(colored_rules),
         ))
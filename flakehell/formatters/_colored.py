@@ -4,12 +4,9 @@ import re
 # external
 from flake8.formatting.default import Default
 from flake8.style_guide import Violation
-from pygments import highlight
-from pygments.formatters import TerminalFormatter
-from pygments.lexers import PythonLexer
 
 # app
-from .._logic import color_code, color_description, colored
+from .._logic import color_code, color_description, colored, use_colors
 
 
 REX_TEXT = re.compile('[A-Z]+')
@@ -21,8 +18,8 @@ class ColoredFormatter(Default):
     def after_init(self) -> None:
         if self.options.format.lower() not in ('default', 'colored'):
             self.error_format = self.options.format
-        self._lexer = PythonLexer()
-        self._formatter = TerminalFormatter()
+        self._lexer = None
+        self._formatter = None
 
     def format(self, error: Violation):
         filename = error.filename
@@ -49,16 +46,24 @@ class ColoredFormatter(Default):
         formated_line = error.physical_line.lstrip()
         adjust = len(error.physical_line) - len(formated_line)
 
-        code = highlight(
-            formated_line,
-            self._lexer,
-            self._formatter,
-        )
+        code = formated_line
+        if use_colors():
+            code = self._highlight(formated_line)
 
         return '  {code}  {pointer}^'.format(
             code=code,
             pointer=' ' * (error.column_number - 1 - adjust),
         )
 
+    def _highlight(self, line: str) -> str:
+        # pygments is imported only when the source is shown in a terminal
+        from pygments import highlight
+        if self._lexer is None:
+            from pygments.formatters import TerminalFormatter
+            from pygments.lexers import PythonLexer
+            self._lexer = PythonLexer()
+            self._formatter = TerminalFormatter()
+        return highlight(line, self._lexer, self._formatter)
+
     def _should_show_source(self, error: Violation) -> bool:
         return self.options.show_source and error.physical_line is not None
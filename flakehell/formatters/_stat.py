@@ -13,6 +13,9 @@ from ._colored import ColoredFormatter
 class StatFormatter(ColoredFormatter):
     """
     Show count of every code occurance
+
+    It needs only counts, so violations aren't sent from checks one by one.
+    See `handle_count`.
     """
     _codes: DefaultDict[str, DefaultDict[str, int]]
     _msgs: DefaultDict[str, Dict[str, str]]
@@ -23,9 +26,18 @@ class StatFormatter(ColoredFormatter):
         self._msgs = defaultdict(dict)
 
     def format(self, error: Violation) -> None:
-        plugin = getattr(error, 'plugin', '')
-        self._codes[plugin][error.code] += 1
-        self._msgs[plugin][error.code] = error.text
+        self.handle_count(
+            code=error.code,
+            plugin=getattr(error, 'plugin', ''),
+            text=error.text,
+            count=1,
+        )
+
+    def handle_count(self, code: str, plugin: str, text: str, count: int) -> None:
+        """Count a few violations of the same code at once.
+        """
+        self._codes[plugin][code] += count
+        self._msgs[plugin][code] = text
 
     def stop(self) -> None:
         for plugin, codes in sorted(self._codes.items()):
@@ -1,12 +1,25 @@
 # built-in
+from io import BytesIO, TextIOWrapper
 from pathlib import Path
 from types import MappingProxyType
-from typing import List, Mapping, Tuple
+from typing import List, Mapping, TextIO, Tuple
 
 
 class BaseParser:
     ignore: Mapping[str, Tuple[str, ...]] = MappingProxyType({})
 
-    @staticmethod
-    def parse(path: Path) -> List[str]:
+    @classmethod
+    def parse(cls, path: Path) -> List[str]:
+        return cls.parse_source(source=path.read_bytes(), path=path)
+
+    @classmethod
+    def parse_source(cls, source: bytes, path: Path) -> List[str]:
+        """Get lines of python code from the already read content of the file.
+        """
         raise NotImplementedError
+
+    @staticmethod
+    def _decode(source: bytes, encoding: str = 'utf8') -> TextIO:
+        """Text stream for the content with the same newlines handling as `open` has.
+        """
+        return TextIOWrapper(BytesIO(source), encoding=encoding)
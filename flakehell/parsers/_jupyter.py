@@ -8,10 +8,10 @@ from ._base import BaseParser
 
 
 class JupyterParser(BaseParser):
-    @staticmethod
-    def parse(path: Path) -> List[str]:
+    @classmethod
+    def parse_source(cls, source: bytes, path: Path) -> List[str]:
         lines = []
-        with path.open(encoding='utf8') as stream:
+        with cls._decode(source) as stream:
             notebook = json.load(stream)
             for cell in notebook['cells']:
                 if cell['cell_type'] != 'code':
@@ -1,5 +1,6 @@
 # built-in
 import tokenize
+from io import BytesIO, TextIOWrapper
 from pathlib import Path
 from typing import List
 
@@ -8,11 +9,12 @@ from ._base import BaseParser
 
 
 class PythonParser(BaseParser):
-    @staticmethod
-    def parse(path: Path) -> List[str]:
+    @classmethod
+    def parse_source(cls, source: bytes, path: Path) -> List[str]:
+        # the same as `tokenize.open` does
         try:
-            with tokenize.open(str(path)) as fd:
-                return fd.readlines()
+            encoding, _ = tokenize.detect_encoding(BytesIO(source).readline)
+            stream = TextIOWrapper(BytesIO(source), encoding, line_buffering=True)
+            return stream.readlines()
         except (SyntaxError, UnicodeError):
-            with open(str(path), encoding='utf8') as fd:
-                return fd.readlines()
+            return cls._decode(source).readlines()
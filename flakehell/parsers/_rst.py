@@ -14,13 +14,13 @@ class RSTParser(BaseParser):
     })
 
     @classmethod
-    def parse(cls, path: Path) -> List[str]:
+    def parse_source(cls, source: bytes, path: Path) -> List[str]:
         code_found = False
         code_type = None
         indent = None
         lines = []
 
-        with path.open(encoding='utf8') as stream:
+        with cls._decode(source) as stream:
             for line in stream:
                 # leave empty lines as-is
                 if not line.strip():
@@ -14,11 +14,22 @@ class YAMLParser(BaseParser):
 
     @classmethod
     def parse(cls, path: Path) -> List[str]:
-        if not path.name.startswith(('test-', 'test_')):
+        # don't read files that can't have tests
+        if not cls._is_test(path):
             return []
-        with path.open(encoding='utf8') as stream:
+        return super().parse(path=path)
+
+    @classmethod
+    def parse_source(cls, source: bytes, path: Path) -> List[str]:
+        if not cls._is_test(path):
+            return []
+        with cls._decode(source) as stream:
             return cls._pytest_mypy_plugins(stream)
 
+    @staticmethod
+    def _is_test(path: Path) -> bool:
+        return path.name.startswith(('test-', 'test_'))
+
     @staticmethod
     def _pytest_mypy_plugins(stream) -> List[str]:
         """Parse pytest-mypy-plugins tests
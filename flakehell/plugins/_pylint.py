@@ -1,7 +1,7 @@
 # built-in
 from ast import AST
 from tokenize import TokenInfo
-from typing import Sequence
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
 
 # external
 try:
@@ -13,8 +13,15 @@ except ImportError:
     Run = None
     BaseReporter = object
 
+if TYPE_CHECKING:
+    from pylint.lint import PyLinter
+
 
 STDIN = 'stdin'
+# Messages about a few files checked in the same run: `cyclic-import` and `duplicate-code`.
+# Results of a file are cached by its content only, and files are checked by batches
+# that depend on what files have cache. So, these messages aren't reported.
+CROSS_FILE_MESSAGES = frozenset({'R0401', 'R0801'})
 
 
 class Reporter(BaseReporter):
@@ -29,7 +36,10 @@ class Reporter(BaseReporter):
         # ignore `invalid syntax` messages, it is already checked by `pycodestyle`
         if msg.msg_id == 'E0001':
             return
+        if msg.msg_id in CROSS_FILE_MESSAGES:
+            return
         self.errors.append(dict(
+            path=msg.abspath,
             row=msg.line,
             col=msg.column,
             text='{} {} ({})'.format(msg.msg_id, msg.msg or '', msg.symbol),
@@ -41,6 +51,11 @@ class PyLintChecker:
     name = 'pylint'
     version = version
 
+    # One linter per process, it is created for the first checked file.
+    # So, the config is read and pylint plugins are loaded only once,
+    # and the astroid cache of imported modules is shared between files.
+    _linter: Optional['PyLinter'] = None
+
     def __init__(self, tree: AST, file_tokens: Sequence[TokenInfo], filename: str = STDIN) -> None:
         self.tree = tree
         self.filename = filename
@@ -52,6 +67,28 @@ class PyLintChecker:
             return
 
         reporter = Reporter()
-        Run([self.filename], reporter=reporter, do_exit=False)
+        self._check(filenames=[self.filename], reporter=reporter)
         for error in reporter.errors:
             yield error['row'], error['col'], error['text'], type(self)
+
+    @classmethod
+    def run_batch(cls, filenames: List[str], options) -> Iterator[Tuple[str, int, int, str]]:
+        """Check all files in one pass of pylint.
+        """
+        # pylint is not installed, skip
+        if Run is None:
+            return
+
+        reporter = Reporter()
+        cls._check(filenames=filenames, reporter=reporter)
+        for error in reporter.errors:
+            yield error['path'], error['row'], error['col'], error['text']
+
+    @classmethod
+    def _check(cls, filenames: List[str], reporter: Reporter) -> None:
+        if cls._linter is None:
+            run = Run(filenames, reporter=reporter, do_exit=False)
+            cls._linter = run.linter
+            return
+        cls._linter.set_reporter(reporter)
+        cls._linter.check(filenames)
@@ -12,6 +12,9 @@ from flake8.utils import parse_unified_diff, stdin_get_value
 
 # project
 from flakehell._cli import main
+from flakehell._constants import NAME, VERSION
+from flakehell._patched import FlakeHellApplication, _checkers
+from flakehell.commands._lint import run_lint
 
 # app
 from .utils import chdir
@@ -70,6 +73,29 @@ def test_version(capsys):
     assert 'Flake8' in captured.out
 
 
+# modules that commands import only when they are needed
+HEAVY_MODULES = ('flake8.main.application', 'pygments', 'urllib3', 'toml', 'colorama')
+# in microseconds, as reported by `-X importtime`
+IMPORT_BUDGET = 200000
+
+
+def test_import_time():
+    code = 'import sys; from flakehell._cli import main; main(["--version"]); print(" ".join(sys.modules))'
+    # stdout isn't a terminal, so colorama isn't needed
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+    )
+    assert result.returncode == 0
+    modules = set(result.stdout.splitlines()[-1].split())
+    for name in HEAVY_MODULES:
+        assert name not in modules
+
+    # the last report for the module is for the top-level import, with the total time
+    reports = [line for line in result.stderr.splitlines() if line.endswith('| flakehell._cli')]
+    assert int(reports[-1].split('|')[1]) < IMPORT_BUDGET
+
+
 @patch('sys.argv', ['flakehell'])
 def test_lint_help(capsys):
     result = main(['lint', '--help'])
@@ -116,6 +142,87 @@ def test_exceptions(capsys, tmp_path: Path):
     assert captured.out.strip() == dedent(exp).strip()
 
 
+@patch('sys.argv', ['flakehell'])
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_streaming(capsys, tmp_path: Path, jobs: str):
+    (tmp_path / 'pyproject.toml').write_text('[tool.flakehell.plugins]\npyflakes = ["+*"]\n')
+    for name in 'abcdefgh':
+        (tmp_path / (name + '.py')).write_text('import {}\n'.format(name))
+    with chdir(tmp_path):
+        result = main(['lint', '--format', 'default', '--streaming', '--jobs', jobs])
+    assert result == (1, '')
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    # the order is the same as without streaming
+    with chdir(tmp_path):
+        main(['lint', '--format', 'default', '--jobs', jobs])
+    expected = capsys.readouterr().out
+    assert captured.out == expected
+    assert len(expected.splitlines()) == 8
+
+
+@patch('sys.argv', ['flakehell'])
+@patch('flakehell._patched._checkers.REORDER_WINDOW', 2)
+def test_longest_first(capsys, tmp_path: Path):
+    (tmp_path / 'pyproject.toml').write_text('[tool.flakehell.plugins]\npyflakes = ["+*"]\n')
+    # the content is unique, so files aren't in cache
+    for name, size in (('a', 1), ('b', 1000), ('c', 10000)):
+        (tmp_path / (name + '.py')).write_text('# {}\n'.format(tmp_path) + 'a = 1\n' * size)
+
+    run_task = _checkers._run_task
+    filenames = []
+
+    def record(task):
+        filenames.append(getattr(task, 'filename', None))
+        return run_task(task)
+
+    with chdir(tmp_path), patch('flakehell._patched._checkers._run_task', record):
+        main(['lint', '--format', 'default', '--jobs', '1'])
+    # files are ordered by size before they are read, the biggest file is checked first
+    assert filenames[:2] == ['./c.py', './b.py']
+
+
+@patch('sys.argv', ['flakehell'])
+def test_explicit_jobs(capsys, tmp_path: Path):
+    (tmp_path / 'pyproject.toml').write_text('[tool.flakehell.plugins]\npyflakes = ["+*"]\n')
+    for name in 'ab':
+        (tmp_path / (name + '.py')).write_text('# {}\nimport os\n'.format(tmp_path))
+    # without a pool, files are checked in the main process
+    with chdir(tmp_path), patch.object(_checkers, '_try_initialize_processpool', return_value=None) as mocked:
+        result = main(['lint', '--format', 'default', '--jobs', '2'])
+    assert result == (1, '')
+    # a small file isn't checked in the main process if the jobs are passed
+    mocked.assert_called_once_with(2)
+    assert len(capsys.readouterr().out.splitlines()) == 2
+
+
+@patch('sys.argv', ['flakehell'])
+def test_initialized_app(capsys, tmp_path: Path):
+    (tmp_path / 'pyproject.toml').write_text('[tool.flakehell.plugins]\npyflakes = ["+*"]\n')
+    (tmp_path / 'a.py').write_text('import os\n')
+    (tmp_path / 'b.py').write_text('import sys\n')
+    app = FlakeHellApplication(program=NAME, version=VERSION)
+    with chdir(tmp_path):
+        assert run_lint(['--format', 'default', 'a.py'], app=app) == (1, '')
+        assert capsys.readouterr().out == "a.py:1:1: F401 'os' imported but unused\n"
+        # plugins aren't found again for the next run with other arguments
+        with patch.object(app, 'find_plugins') as mocked:
+            assert run_lint(['--format', 'default', 'b.py'], app=app) == (1, '')
+    mocked.assert_not_called()
+    assert capsys.readouterr().out == "b.py:1:1: F401 'sys' imported but unused\n"
+
+
+@patch('sys.argv', ['flakehell'])
+def test_plugins_from_registry(capsys):
+    main(['plugins'])
+    expected = capsys.readouterr().out
+    # installed plugins are taken from the registry without importing them
+    with patch('flakehell._patched._plugins.FlakeHellPlugin.load_plugin') as mocked:
+        main(['plugins'])
+    mocked.assert_not_called()
+    assert capsys.readouterr().out == expected
+
+
 @patch('sys.argv', ['flakehell'])
 @patch('sys.stdin', Mock())
 def test_diff(capsys, tmp_path: Path):
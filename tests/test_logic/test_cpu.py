@@ -0,0 +1,34 @@
+# built-in
+from pathlib import Path
+
+# external
+import pytest
+
+# project
+from flakehell._logic import get_cpu_count
+from flakehell._logic._cpu import get_cpu_quota
+
+
+@pytest.mark.parametrize('files, expected', [
+    ({}, None),
+    ({'cpu.max': 'max 100000\n'}, None),
+    ({'cpu.max': '200000 100000\n'}, 2),
+    ({'cpu.max': '150000 100000\n'}, 2),
+    ({'cpu.max': '10000 100000\n'}, 1),
+    ({'cpu/cpu.cfs_quota_us': '-1\n', 'cpu/cpu.cfs_period_us': '100000\n'}, None),
+    ({'cpu/cpu.cfs_quota_us': '400000\n', 'cpu/cpu.cfs_period_us': '100000\n'}, 4),
+    ({'cpu,cpuacct/cpu.cfs_quota_us': '300000\n', 'cpu,cpuacct/cpu.cfs_period_us': '100000\n'}, 3),
+    ({'cpu.max': 'broken'}, None),
+])
+def test_get_cpu_quota(tmp_path: Path, files, expected):
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    assert get_cpu_quota(tmp_path) == expected
+
+
+def test_get_cpu_count(tmp_path: Path):
+    (tmp_path / 'cpu.max').write_text('100000 100000\n')
+    assert get_cpu_count(tmp_path) == 1
+    assert get_cpu_count(tmp_path / 'missed') >= 1
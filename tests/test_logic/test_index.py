@@ -0,0 +1,143 @@
+# built-in
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+# external
+import pytest
+
+# project
+from flakehell._logic import FileIndex, hash_content
+
+
+def make_old(path: Path) -> None:
+    # files modified right now aren't indexed to avoid racy entries
+    os.utime(str(path), (1000000000, 1000000000))
+
+
+def test_digest(tmp_path: Path):
+    path = tmp_path / 'example.py'
+    path.write_text('a = 1\n')
+    make_old(path)
+    expected = hash_content(b'a = 1\n', algorithm='blake2b')
+
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    assert index.digest(path) == expected
+    assert index.digest(tmp_path / 'missed.py') is None
+    index.close()
+
+    # unchanged file is neither read nor hashed
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    with patch('flakehell._logic._index.hash_content') as mocked:
+        assert index.digest(path) == expected
+    mocked.assert_not_called()
+    index.close()
+
+    # changed file is hashed again
+    path.write_text('a = 12\n')
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    assert index.digest(path) == hash_content(b'a = 12\n', algorithm='blake2b')
+    index.close()
+
+
+def test_read(tmp_path: Path):
+    path = tmp_path / 'example.py'
+    path.write_text('a = 1\n')
+    make_old(path)
+
+    # content is returned only if the file was read
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    assert index.read(path) == (hash_content(b'a = 1\n', algorithm='blake2b'), b'a = 1\n')
+    assert index.read(path) == (hash_content(b'a = 1\n', algorithm='blake2b'), None)
+    assert index.read(tmp_path / 'missed.py') == (None, None)
+    index.close()
+
+
+def test_git_blob_hash():
+    # the same as `git hash-object` for an empty file
+    assert hash_content(b'', algorithm='git') == 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+    with pytest.raises(ValueError):
+        hash_content(b'', algorithm='unknown')
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+def test_git_digests(tmp_path: Path):
+    path = tmp_path / 'example.py'
+    path.write_text('a = 1\n')
+    subprocess.run(['git', 'init', '-q'], cwd=str(tmp_path), check=True)
+    subprocess.run(['git', 'add', 'example.py'], cwd=str(tmp_path), check=True)
+    blob = subprocess.run(
+        ['git', 'hash-object', 'example.py'],
+        cwd=str(tmp_path), stdout=subprocess.PIPE, check=True,
+    ).stdout.decode().strip()
+
+    index = FileIndex(path=tmp_path / 'cache', algorithm='git', root=tmp_path)
+    with patch('flakehell._logic._index.hash_content') as mocked:
+        assert index.digest(path) == blob
+    mocked.assert_not_called()
+
+    # modified files are hashed the same way as git does
+    path.write_text('a = 12\n')
+    index = FileIndex(path=tmp_path / 'cache', algorithm='git', root=tmp_path)
+    assert index.digest(path) == hash_content(b'a = 12\n', algorithm='git')
+
+
+def test_timings(tmp_path: Path):
+    path = tmp_path / 'example.py'
+    path.write_text('a = 1\n' * 10)
+    make_old(path)
+
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    assert index.timings == {}
+    index.digest(path)
+    index.set_timings(path, {'pyflakes': 0.3, 'pycodestyle': 0.6})
+    index.close()
+
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    assert index.timings == {str(path): {'pyflakes': 0.3, 'pycodestyle': 0.6}}
+    rates = index.rates()
+    assert rates['pyflakes'] == pytest.approx(0.3 / 60)
+    assert rates['pycodestyle'] == pytest.approx(0.6 / 60)
+    index.clear()
+    assert index.timings == {}
+    index.close()
+
+
+def test_prune(tmp_path: Path):
+    paths = []
+    for name in ('a.py', 'b.py', 'c.py'):
+        path = tmp_path / name
+        path.write_text('a = 1\n')
+        make_old(path)
+        paths.append(path)
+
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    for path in paths:
+        index.digest(path)
+        index.set_timings(path, {'pyflakes': 0.1})
+    index.close()
+
+    # not read files are kept, even if they don't exist
+    paths[0].unlink()
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    index.digest(paths[1])
+    index.close()
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    assert set(index.entries) == {str(path) for path in paths}
+
+    # all files in the root are read, other files are forgotten
+    index.digest(paths[1])
+    index.digest(paths[2])
+    index.close(prune=True)
+    index = FileIndex(path=tmp_path / 'cache', root=tmp_path)
+    assert set(index.entries) == {str(paths[1]), str(paths[2])}
+    assert set(index.timings) == {str(paths[1]), str(paths[2])}
+
+    # all projects are checked on explicit prune
+    paths[1].unlink()
+    assert index.prune() == 1
+    assert set(index.entries) == {str(paths[2])}
+    assert set(index.timings) == {str(paths[2])}
+    index.close()
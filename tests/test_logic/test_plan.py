@@ -0,0 +1,84 @@
+# built-in
+from pathlib import Path
+
+# project
+from flakehell._logic import ChecksPlan, ExceptionsIndex, get_exceptions
+
+
+def make_check(name: str) -> dict:
+    return {'name': name, 'plugin_name': name, 'plugin': make_check}
+
+
+def test_exceptions_index_order(tmp_path: Path):
+    exceptions = {
+        'tests/': {'pyflakes': ['+*']},
+        'tests/test_': {'pyflakes': ['-*']},
+        '*.py': {'pycodestyle': ['+*']},
+        'tests/*.py': {'pycodestyle': ['-*']},
+    }
+    (tmp_path / 'tests').mkdir()
+    path = tmp_path / 'tests' / 'test_example.py'
+    index = ExceptionsIndex(exceptions=exceptions, root=tmp_path)
+    assert index.match(path) == ('tests/test_', 'tests/', 'tests/*.py', '*.py')
+    assert index.get(path) == get_exceptions(path=path, exceptions=exceptions, root=tmp_path)
+    assert index.get(path) == {'pyflakes': ['+*'], 'pycodestyle': ['+*']}
+
+
+def test_exceptions_index_out_of_root(tmp_path: Path):
+    index = ExceptionsIndex(exceptions={'': {'pyflakes': ['+*']}}, root=tmp_path / 'root')
+    assert index.match(tmp_path / 'example.py') == ()
+    assert index.match(tmp_path / 'root' / 'example.py') == ('', )
+
+
+def test_checks_plan(tmp_path: Path):
+    checks = dict(
+        ast_plugins=[make_check('pyflakes')],
+        logical_line_plugins=[make_check('pycodestyle')],
+        physical_line_plugins=[],
+    )
+    plan = ChecksPlan(
+        checks=checks,
+        plugins={'pycodestyle': ['+*', '-E501']},
+        exceptions={'tests/': {'pyflakes': ['+*']}},
+        root=tmp_path,
+    )
+    (tmp_path / 'tests').mkdir()
+    source_path = str(tmp_path / 'example.py')
+    test_path = str(tmp_path / 'tests' / 'test_example.py')
+    other_test_path = str(tmp_path / 'tests' / 'test_other.py')
+
+    selected = plan.checks_for(source_path)
+    assert selected['ast_plugins'] == []
+    assert selected['logical_line_plugins'] == checks['logical_line_plugins']
+
+    selected = plan.checks_for(test_path)
+    assert selected == checks
+    # the plan is shared between files with the same exceptions
+    assert plan.checks_for(other_test_path) is selected
+
+    assert plan.rules_for('pyflakes', source_path) == []
+    assert plan.rules_for('pyflakes', test_path) == ['+*']
+    assert plan.rules_for('pycodestyle', test_path) == ['+*', '-E501']
+
+
+def test_checks_plan_nothing_to_run(tmp_path: Path):
+    checks = dict(ast_plugins=[make_check('pyflakes')])
+    plan = ChecksPlan(checks=checks, plugins={'pyflakes': ['-*']}, exceptions={}, root=tmp_path)
+    assert plan.checks_for(str(tmp_path / 'example.py')) is None
+
+
+def test_checks_plan_excluded_codes(tmp_path: Path):
+    pyflakes = {'name': 'F', 'plugin_name': 'pyflakes', 'plugin': make_check}
+    pycodestyle = {'name': 'pycodestyle.tabs', 'plugin_name': 'pycodestyle', 'plugin': make_check}
+    plan = ChecksPlan(
+        checks=dict(ast_plugins=[pyflakes], logical_line_plugins=[pycodestyle]),
+        plugins={'pyflakes': ['+*', '-F*'], 'pycodestyle': ['+*', '-E*', '-W*']},
+        exceptions={'tests/': {'pycodestyle': ['+W*']}},
+        root=tmp_path,
+    )
+    (tmp_path / 'tests').mkdir()
+    assert plan.checks_for(str(tmp_path / 'example.py')) is None
+
+    # codes are enabled again by exceptions
+    selected = plan.checks_for(str(tmp_path / 'tests' / 'test_example.py'))
+    assert selected == dict(ast_plugins=[], logical_line_plugins=[pycodestyle])
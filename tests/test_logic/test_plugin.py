@@ -1,8 +1,11 @@
 # built-in
 from pathlib import Path
 
+# external
+import pytest
+
 # project
-from flakehell._logic import get_exceptions
+from flakehell._logic import CompiledRules, check_include, get_exceptions
 
 
 def test_get_exceptions(tmp_path: Path):
@@ -46,3 +49,48 @@ def test_get_exceptions_with_intersections(tmp_path: Path):
 
     result = get_exceptions(path=test_file_path, exceptions=exceptions, root=tmp_path)
     assert result == {'pyflakes': ['+*'], 'pycodestyle': ['+*']}
+
+
+@pytest.mark.parametrize('code, rules, expected', [
+    ('E501', ['+*'], True),
+    ('E501', ['+*', '-E501'], False),
+    ('E501', ['-E501', '+*'], False),
+    ('E501', ['-*', '+E5??'], True),
+    ('E501', ['+*', '-E*', '+e501'], True),
+    ('E501', ['+E501', '-E*'], True),
+    ('W291', ['+E*'], False),
+    ('W291', [], False),
+    ('E902', ['-*'], True),
+])
+def test_compiled_rules(code, rules, expected):
+    assert check_include(code=code, rules=rules) is expected
+    compiled = CompiledRules(rules)
+    assert compiled.include(code) is expected
+    # memoized decision
+    assert compiled.include(code) is expected
+
+
+def test_compiled_rules_invalid():
+    with pytest.raises(ValueError):
+        CompiledRules(['E501'])
+
+
+@pytest.mark.parametrize('prefix, rules, expected', [
+    ('E', ['+*'], True),
+    ('E', ['+*', '-E*'], False),
+    ('E', ['+*', '-E*', '-W*'], False),
+    ('W', ['+*', '-E*'], True),
+    ('E', ['-E*', '+*'], True),
+    ('E', ['+W*'], False),
+    ('E', ['+*', '-E*', '+e501'], True),
+    ('E', ['+E501', '-E*'], True),
+    ('E', ['-*', '+E5??'], True),
+    ('C90', ['+C*'], True),
+    ('C90', ['+*', '-C9*'], False),
+    # excludes only some codes with the prefix
+    ('E', ['+*', '-E5*'], True),
+    ('C90', ['+*', '-C901'], True),
+    ('E', [], False),
+])
+def test_compiled_rules_may_include(prefix, rules, expected):
+    assert CompiledRules(rules).may_include(prefix) is expected
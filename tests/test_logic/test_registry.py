@@ -0,0 +1,56 @@
+# built-in
+from pathlib import Path
+
+# project
+from flakehell._logic import PluginRegistry
+from flakehell._logic._registry import get_fingerprint
+
+
+def test_registry(tmp_path: Path):
+    path = tmp_path / 'cache' / 'plugins.json'
+    registry = PluginRegistry(path=path)
+    assert registry.get('flake8-example==1.0:E=example:Checker') is None
+    registry.set('flake8-example==1.0:E=example:Checker', 'flake8-example')
+    registry.save()
+    assert path.exists()
+
+    registry = PluginRegistry(path=path)
+    assert registry.get('flake8-example==1.0:E=example:Checker') == 'flake8-example'
+    assert registry.changed is False
+
+    path.write_text('{broken')
+    assert PluginRegistry(path=path).get('flake8-example==1.0:E=example:Checker') is None
+
+
+def test_registry_fingerprint(tmp_path: Path):
+    site = tmp_path / 'site'
+    site.mkdir()
+    path = tmp_path / 'plugins.json'
+    entry_points = [['E', 'example:Checker', 'flake8-example', '1.0']]
+    registry = PluginRegistry(path=path, paths=[str(site)])
+    assert registry.get_entry_points('flake8.extension') is None
+    registry.set('flake8-example==1.0:E=example:Checker', 'flake8-example')
+    registry.set_entry_points('flake8.extension', entry_points)
+    registry.set_installed([dict(name='flake8-example')])
+    registry.save()
+
+    registry = PluginRegistry(path=path, paths=[str(site)])
+    assert registry.get_entry_points('flake8.extension') == entry_points
+    assert registry.get_installed() == [dict(name='flake8-example')]
+
+    # installed distributions are changed
+    (site / 'flake8_other-1.0.dist-info').mkdir()
+    registry = PluginRegistry(path=path, paths=[str(site)])
+    assert registry.get_entry_points('flake8.extension') is None
+    assert registry.get_installed() is None
+    # names don't depend on other distributions
+    assert registry.get('flake8-example==1.0:E=example:Checker') == 'flake8-example'
+
+
+def test_get_fingerprint(tmp_path: Path):
+    before = get_fingerprint([str(tmp_path)])
+    (tmp_path / 'example.py').touch()
+    assert get_fingerprint([str(tmp_path)]) == before
+    (tmp_path / 'example-1.0.dist-info').mkdir()
+    assert get_fingerprint([str(tmp_path)]) != before
+    assert get_fingerprint([str(tmp_path / 'missed')]) != before
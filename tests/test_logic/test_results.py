@@ -0,0 +1,43 @@
+# project
+from flakehell._logic import count_results, decode_counts, decode_results, encode_results, merge_counts
+
+
+def test_encode_results():
+    results = [
+        ['pycodestyle', 'E501', 1, 80, 'line too long (82 > 79 characters)', 'a = 1  # ...\n'],
+        ['pycodestyle', 'W291', 1, 81, 'trailing whitespace', 'a = 1  # ...\n'],
+        ['pyflakes', 'E999', 2, None, 'SyntaxError: invalid syntax', None],
+        ['pycodestyle', 'W291', 3, 5, 'trailing whitespace', 'b = \n'],
+    ]
+    encoded = encode_results(results)
+    assert list(decode_results(encoded)) == results
+    # every distinct string is stored once
+    assert len(encoded['strings']) == 10
+    assert encoded['strings'].count('a = 1  # ...\n') == 1
+
+
+def test_encode_no_results():
+    encoded = encode_results([])
+    assert list(decode_results(encoded)) == []
+
+
+def test_count_results():
+    results = [
+        ['pycodestyle', 'E501', 9, 80, 'line too long (90 > 79 characters)', None],
+        ['pycodestyle', 'E501', 1, 80, 'line too long (82 > 79 characters)', None],
+        ['pycodestyle', 'W291', 1, 81, 'trailing whitespace', None],
+        ['pyflakes', 'F401', 1, 0, "'os' imported but unused", None],
+    ]
+    counts = count_results(results)
+    assert counts == [
+        # texts are in the order of line numbers
+        ['pycodestyle', 'E501', 2, 'line too long (82 > 79 characters)', 'line too long (90 > 79 characters)'],
+        ['pyflakes', 'F401', 1, "'os' imported but unused", "'os' imported but unused"],
+        ['pycodestyle', 'W291', 1, 'trailing whitespace', 'trailing whitespace'],
+    ]
+    encoded = encode_results([], counts=counts)
+    assert list(decode_counts(encoded)) == counts
+    assert list(decode_results(encoded)) == []
+
+    merged = merge_counts(counts + [['pyflakes', 'F401', 3, 'first', 'last']])
+    assert merged[1] == ['pyflakes', 'F401', 4, "'os' imported but unused", 'last']
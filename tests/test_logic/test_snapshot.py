@@ -0,0 +1,102 @@
+# built-in
+from pathlib import Path
+from types import SimpleNamespace
+
+# project
+from flakehell._logic import FileIndex, Snapshot, get_path_keys, get_store
+
+
+def make_snapshot(tmp_path: Path, fingerprints: dict) -> Snapshot:
+    return Snapshot.create(
+        checker=SimpleNamespace(filename=str(tmp_path / 'example.py')),
+        fingerprints=fingerprints,
+        store=get_store(name='sqlite', path=tmp_path / 'cache'),
+        index=FileIndex(path=tmp_path / 'cache', root=tmp_path),
+    )
+
+
+def test_cache_per_plugin(tmp_path: Path):
+    (tmp_path / 'example.py').write_text('import os\n')
+    snapshot = make_snapshot(tmp_path, dict(pyflakes='1', pycodestyle='1'))
+    assert snapshot.missed == {'pyflakes', 'pycodestyle'}
+    assert not snapshot.exists()
+    snapshot.dump([['pyflakes', 'F401', 1, 1, "'os' imported but unused", 'import os\n']])
+    snapshot.store.close()
+
+    # changed fingerprint invalidates cache only for one plugin
+    snapshot = make_snapshot(tmp_path, dict(pyflakes='1', pycodestyle='2'))
+    assert snapshot.missed == {'pycodestyle'}
+    assert snapshot.results == [['pyflakes', 'F401', 1, 1, "'os' imported but unused", 'import os\n']]
+
+    snapshot = make_snapshot(tmp_path, dict(pyflakes='1'))
+    assert snapshot.exists()
+
+    # changed content invalidates cache for all plugins
+    (tmp_path / 'example.py').write_text('import sys\n')
+    snapshot = make_snapshot(tmp_path, dict(pyflakes='1'))
+    assert snapshot.missed == {'pyflakes'}
+
+
+def test_do_not_cache_failed_files(tmp_path: Path):
+    (tmp_path / 'example.py').write_text('I exist!\n')
+    snapshot = make_snapshot(tmp_path, dict(pyflakes='1'))
+    snapshot.dump([['pyflakes', 'E999', 1, 1, 'SyntaxError: invalid syntax', 'I exist!\n']])
+    snapshot.store.close()
+
+    snapshot = make_snapshot(tmp_path, dict(pyflakes='1'))
+    assert snapshot.missed == {'pyflakes'}
+
+
+def test_no_file(tmp_path: Path):
+    snapshot = make_snapshot(tmp_path, dict(pyflakes='1'))
+    assert snapshot.digest is None
+    assert snapshot.missed == {'pyflakes'}
+    snapshot.dump([])
+    assert snapshot.missed == {'pyflakes'}
+
+
+def test_cache_shared_between_paths(tmp_path: Path):
+    results = [['pycodestyle', 'W291', 1, 10, 'trailing whitespace', 'import os \n']]
+    path_keys = dict(flake8_path=Path.as_posix)
+    # the same file in another checkout and vendored
+    for name, relative_path in (('first', 'example.py'), ('second', 'vendor/example.py')):
+        root = tmp_path / name / 'project'
+        (root / relative_path).parent.mkdir(parents=True)
+        (root / relative_path).write_text('import os \n')
+        snapshot = Snapshot.create(
+            checker=SimpleNamespace(filename=str(root / relative_path)),
+            fingerprints=dict(pycodestyle='1', flake8_path='1'),
+            store=get_store(name='json', path=tmp_path / 'shared', index_path=tmp_path / name),
+            index=FileIndex(path=tmp_path / name, root=root),
+            path_keys=path_keys,
+        )
+        if name == 'first':
+            snapshot.dump(results)
+            snapshot.store.close()
+
+    # hits the cache unless the plugin depends on the path
+    assert snapshot.relative_path == Path('vendor', 'example.py')
+    assert snapshot.missed == {'flake8_path'}
+    assert snapshot.results == results
+
+    path_keys['flake8_path'] = lambda path: path.name
+    snapshot._cached = None
+    assert snapshot.exists()
+
+
+def test_path_keys_doctest_options():
+    plugin = SimpleNamespace(
+        parameters=dict(tree=True, filename=True),
+        to_dictionary=lambda: dict(name='F', plugin_name='pyflakes'),
+    )
+    path = Path('a', '__init__.py')
+    options = SimpleNamespace(include_in_doctest=[], exclude_from_doctest=[])
+    path_key = get_path_keys(plugins=[plugin], options=options)['pyflakes']
+    assert path_key(path) == '__init__.py'
+    assert path_key(Path('a', 'x.py')) == ''
+
+    # doctests are checked depending on the whole path
+    options.include_in_doctest = ['a']
+    path_key = get_path_keys(plugins=[plugin], options=options)['pyflakes']
+    assert path_key(path) == 'a/__init__.py'
+    assert path_key(Path('a', 'x.py')) == 'a/x.py'
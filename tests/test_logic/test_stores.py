@@ -0,0 +1,118 @@
+# built-in
+from collections import OrderedDict
+from pathlib import Path
+from time import time
+
+# external
+import pytest
+
+# project
+from flakehell._logic import STORES, MemoryStore, get_store
+
+
+@pytest.mark.parametrize('name', sorted(STORES))
+def test_store(name: str, tmp_path: Path):
+    store = get_store(name=name, path=tmp_path)
+    assert store.get('key') is None
+    store.set('key', dict(results=[1, 2], digest='abc'))
+    assert store.get('key') == dict(results=[1, 2], digest='abc')
+    store.close()
+
+    store = get_store(name=name, path=tmp_path)
+    assert store.get('key') == dict(results=[1, 2], digest='abc')
+    assert store.prune(max_size=2 ** 20, max_age=3600) == 0
+    assert store.get('key') == dict(results=[1, 2], digest='abc')
+    assert store.prune(max_size=2 ** 20, max_age=-1) == 1
+    assert store.get('key') is None
+    store.close()
+
+
+@pytest.mark.parametrize('name', sorted(STORES))
+def test_usage(name: str, tmp_path: Path):
+    store = get_store(name=name, path=tmp_path)
+    store.set('key1', dict(results=[]))
+    store.set('key2', dict(results=[]))
+    store.close()
+
+    usage = store.usage()
+    assert usage.count == 2
+    assert usage.size == len('{"results": []}') * 2
+    assert time() - usage.oldest < 60
+
+    # replaced entry is counted once
+    store.set('key1', dict(results=[1]))
+    store.close()
+    usage = store.usage()
+    assert usage.count == 2
+    assert usage.size == len('{"results": []}') + len('{"results": [1]}')
+
+    assert store.clear() == 2
+    assert store.usage() == (0, 0, None)
+    store.close()
+
+
+@pytest.mark.parametrize('name', sorted(STORES))
+def test_evict_least_recently_used(name: str, tmp_path: Path):
+    store = get_store(name=name, path=tmp_path)
+    for index in range(10):
+        store.set('key{}'.format(index), dict(results=[]))
+        store.close()
+        store.connection.execute(
+            'UPDATE entries SET used = ? WHERE key = ?',
+            (time() - 100 + index, 'key{}'.format(index)),
+        )
+        store.connection.commit()
+
+    size = store.usage().size
+    # in the budget
+    assert store.prune(max_size=size, max_age=3600) == 0
+    # out of the budget, evict until it is 80% of the budget
+    assert store.prune(max_size=size - 1, max_age=3600) == 3
+    assert store.get('key2') is None
+    assert store.get('key3') is not None
+    assert store.usage().count == 7
+    store.close()
+
+
+def test_shared_json_store(tmp_path: Path):
+    first = get_store(name='json', path=tmp_path / 'shared', index_path=tmp_path / 'first')
+    first.set('key', dict(results=[]))
+    first.close()
+
+    # entries written on another machine are tracked once they are used
+    second = get_store(name='json', path=tmp_path / 'shared', index_path=tmp_path / 'second')
+    assert second.usage().count == 0
+    assert second.get('key') == dict(results=[])
+    second.close()
+    assert second.usage().count == 1
+    assert second.prune(max_size=2 ** 20, max_age=-1) == 1
+    assert first.get('key') is None
+    second.close()
+    first.close()
+
+
+def test_unknown_store(tmp_path: Path):
+    with pytest.raises(ValueError):
+        get_store(name='unknown', path=tmp_path)
+
+
+def test_memory_store(tmp_path: Path):
+    entries = OrderedDict()
+    store = MemoryStore(store=get_store(name='sqlite', path=tmp_path), entries=entries, max_entries=2)
+    store.set('key1', dict(results=[1]))
+    store.set('key2', dict(results=[2]))
+    store.close()
+    assert list(entries) == ['key1', 'key2']
+
+    # entries are shared between runs
+    store = MemoryStore(store=get_store(name='sqlite', path=tmp_path), entries=entries, max_entries=2)
+    assert store.get('key1') == dict(results=[1])
+    assert list(entries) == ['key2', 'key1']
+
+    # the least recently used entry is evicted from memory but not from the store
+    store.set('key3', dict(results=[3]))
+    store.close()
+    assert list(entries) == ['key1', 'key3']
+    assert store.get('key2') == dict(results=[2])
+    assert list(entries) == ['key3', 'key2']
+    store.close()
@@ -1,7 +1,28 @@
+# built-in
+import tokenize
+from pathlib import Path
+
+# external
+import pytest
+
 # project
 from flakehell._constants import DEFAULTS
-from flakehell.parsers import PARSERS
+from flakehell.parsers import PARSERS, PythonParser
 
 
 def test_default_filename():
     assert {name[1:] for name in DEFAULTS['filename']} == set(PARSERS)
+
+
+@pytest.mark.parametrize('content', [
+    b'a = 1\nb = 2\n',
+    b'a = 1\r\nb = 2\r\n',
+    b'# coding: latin-1\na = "\xe9"\n',
+    b'\xef\xbb\xbfa = 1\n',
+])
+def test_parse_source(content: bytes, tmp_path: Path):
+    path = tmp_path / 'example.py'
+    path.write_bytes(content)
+    with tokenize.open(str(path)) as stream:
+        expected = stream.readlines()
+    assert PythonParser.parse_source(source=content, path=path) == expected
@@ -1,8 +1,16 @@
 # built-in
+from argparse import Namespace
+from pathlib import Path
 from unittest import mock
 
+# external
+import pytest
+
 # project
-from flakehell._patched._checkers import FlakeHellFileChecker
+from flakehell._logic import ChecksPlan, decode_counts, decode_results, encode_results, make_baseline
+from flakehell._patched._checkers import (
+    BatchTask, FlakeHellFileChecker, Result, TaskContext, _merge_results, _run_batch, _split_plugins,
+)
 
 
 def test_nonexistent_file():
@@ -49,3 +57,152 @@ def test_catches_exception_on_invalid_syntax(tmp_path):
     assert len(fchecker.results) == 1
     assert fchecker.results[0].error_code == 'E999'
     assert fchecker.results[0].text == 'SyntaxError: invalid syntax'
+
+
+class BatchChecker:
+    @classmethod
+    def run_batch(cls, filenames, options):
+        for filename in filenames:
+            yield str(Path(filename).resolve()), 2, 4, 'B001 checked in batch'
+
+
+def test_run_batch(tmp_path):
+    paths = [tmp_path / 'a.py', tmp_path / 'b.py']
+    for path in paths:
+        path.write_text('a = 1\nb = 2\n')
+    plugin = {
+        'name': 'B',
+        'plugin_name': 'flake8-batch',
+        'plugin': BatchChecker,
+    }
+    options = Namespace(disable_noqa=False, safe=False)
+    task = BatchTask(check=plugin, files=[(3, str(paths[0])), (5, str(paths[1]))], options=options)
+    checked = _run_batch(task)
+    assert [index for index, _ in checked] == [3, 5]
+    for path, (_, (filename, results, _, timings)) in zip(paths, checked):
+        assert filename == str(path)
+        assert set(timings) == {'flake8-batch'}
+        assert len(results) == 1
+        assert results[0].plugin_name == 'flake8-batch'
+        assert results[0].error_code == 'B001'
+        assert results[0].text == 'checked in batch'
+        assert results[0].line == 'b = 2\n'
+
+
+def test_run_batch_noqa_file(tmp_path):
+    path = tmp_path / 'a.py'
+    path.write_text('# flake8: noqa\nb = 2\n')
+    plugin = {
+        'name': 'B',
+        'plugin_name': 'flake8-batch',
+        'plugin': BatchChecker,
+    }
+    options = Namespace(disable_noqa=False, safe=False)
+    [(_, (_, results, _, _))] = _run_batch(BatchTask(check=plugin, files=[(0, str(path))], options=options))
+    assert results is None
+
+    options = Namespace(disable_noqa=True, safe=False)
+    [(_, (_, results, _, _))] = _run_batch(BatchTask(check=plugin, files=[(0, str(path))], options=options))
+    assert len(results) == 1
+
+
+RESULTS = [
+    Result('pyflakes', 'F401', 1, 0, "'os' imported but unused", 'import os\n'),
+    Result('pyflakes', 'F821', 2, 0, "undefined name 'a'", 'a\n'),
+    Result('pycodestyle', 'E501', 3, 80, 'line too long', 'b  # noqa\n'),
+    Result('pycodestyle', 'W291', 4, 1, 'trailing whitespace', 'c \n'),
+]
+
+
+def make_context(**kwargs) -> TaskContext:
+    plan = ChecksPlan(
+        checks=dict(),
+        plugins={'pyflakes': ['+*', '-F401'], 'pycodestyle': ['+*']},
+        exceptions=dict(),
+    )
+    options = Namespace(disable_noqa=False, stdin_display_name='stdin')
+    params = dict(store=mock.MagicMock(), plan=plan, options=options, baseline=set())
+    params.update(kwargs)
+    return TaskContext(**params)
+
+
+def test_task_context_filter():
+    context = make_context()
+    assert [result.error_code for result in context.filter('a.py', RESULTS)] == ['F821', 'W291']
+
+    # out of the diff
+    context = make_context(diff={'a.py': {2}})
+    assert [result.error_code for result in context.filter('a.py', RESULTS)] == ['F821']
+    assert context.filter('b.py', RESULTS) == []
+
+    # baselined
+    baseline = {make_baseline(path='a.py', context='a\n', code='F821', line=2)}
+    context = make_context(baseline=baseline)
+    assert [result.error_code for result in context.filter('a.py', RESULTS)] == ['W291']
+
+
+def test_task_context_finish():
+    context = make_context()
+    ret = context.finish(
+        ret=('a.py', list(RESULTS), dict(), dict()),
+        keys={'pyflakes': 'key1', 'pycodestyle': 'key2'},
+    )
+    # all results are cached, only reportable are returned
+    assert [result[1] for result in decode_results(ret[1])] == ['F821', 'W291']
+    assert ret[4] == 4
+    context.store.set.assert_has_calls([
+        mock.call('key1', encode_results(RESULTS[:2])),
+        mock.call('key2', encode_results(RESULTS[2:])),
+    ])
+
+
+def test_task_context_aggregate():
+    context = make_context(aggregate=True)
+    error = Result('pycodestyle', 'E902', 0, 0, 'OSError: oops', None)
+    ret = context.finish(ret=('a.py', RESULTS + [error], dict(), dict()), keys=dict())
+    # errors of file processing are sent as is, other results are counted
+    assert list(decode_results(ret[1])) == [list(error)]
+    assert list(decode_counts(ret[1])) == [
+        ['pyflakes', 'F821', 1, "undefined name 'a'", "undefined name 'a'"],
+        ['pycodestyle', 'W291', 1, 'trailing whitespace', 'trailing whitespace'],
+    ]
+    assert ret[4] == 5
+
+
+def test_merge_results():
+    statistics = {'logical lines': 2, 'physical lines': 3, 'tokens': 7}
+    result = ['flake8-batch', 'B001', 1, 0, 'text', None]
+    encoded = encode_results([result])
+    timings = {'pyflakes': 0.5, 'flake8-batch': 0.25}
+    merged = _merge_results([
+        ('a.py', encoded, dict(), {'flake8-batch': 0.25}, 2),
+        ('a.py', encoded, statistics, {'pyflakes': 0.5}, 3),
+    ])
+    assert merged == ('a.py', encode_results([result, result]), statistics, timings, 5)
+
+    # the file has top-level `# flake8: noqa`
+    merged = _merge_results([('a.py', encoded, dict(), dict(), 1), ('a.py', None, statistics, dict(), 0)])
+    assert merged == ('a.py', None, statistics, dict(), 0)
+
+
+def test_merge_results_deduplicates_errors():
+    error = ['pycodestyle', 'E999', 1, 2, 'SyntaxError: invalid syntax', None]
+    result = ['pyflakes', 'F401', 1, 0, 'text', None]
+    merged = _merge_results([
+        ('a.py', encode_results([error, result]), dict(), dict(), 2),
+        ('a.py', encode_results([error]), dict(), dict(), 1),
+    ])
+    assert list(decode_results(merged[1])) == [error, result]
+    assert merged[4] == 2
+
+
+@pytest.mark.parametrize('costs, parts, expected', [
+    # fast plugins aren't split
+    ({'pyflakes': 0.1, 'pycodestyle': 0.2}, 4, [{'pyflakes', 'pycodestyle'}]),
+    # the only plugin
+    ({'pylint': 5.0}, 4, [{'pylint'}]),
+    ({'pylint': 3.0, 'pyflakes': 0.5, 'pycodestyle': 1.0}, 4, [{'pylint'}, {'pycodestyle'}, {'pyflakes'}]),
+    ({'pylint': 3.0, 'pyflakes': 0.5, 'pycodestyle': 1.0}, 2, [{'pylint'}, {'pycodestyle', 'pyflakes'}]),
+])
+def test_split_plugins(costs, parts, expected):
+    assert _split_plugins(costs=costs, parts=parts) == [frozenset(group) for group in expected]
@@ -0,0 +1,26 @@
+# built-in
+from pathlib import Path
+
+# external
+from flake8.style_guide import Violation
+
+# project
+from flakehell._patched._server import make_diagnostic, uri_to_path
+
+
+def test_uri_to_path():
+    assert uri_to_path('file:///home/user/my%20project/example.py') == Path('/home/user/my project/example.py')
+
+
+def test_make_diagnostic():
+    violation = Violation('F401', 'example.py', 2, 1, "'os' imported but unused", 'import os\n')
+    assert make_diagnostic(violation) == dict(
+        range=dict(
+            start=dict(line=1, character=0),
+            end=dict(line=1, character=9),
+        ),
+        severity=1,
+        code='F401',
+        source='flakehell',
+        message="'os' imported but unused",
+    )
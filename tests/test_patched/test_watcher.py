@@ -0,0 +1,24 @@
+# external
+from flake8.style_guide import Violation
+
+# project
+from flakehell._patched import Watcher
+
+
+def make_violation(code: str, line_number: int, line: str) -> Violation:
+    return Violation(code, 'example.py', line_number, 1, 'text', line)
+
+
+def test_diff():
+    old = [
+        make_violation('F401', 1, 'import os\n'),
+        make_violation('F401', 2, 'import sys\n'),
+    ]
+    actual = [
+        # moved to another line
+        make_violation('F401', 2, 'import os\n'),
+        make_violation('E225', 3, 'x=1\n'),
+    ]
+    new, resolved = Watcher._diff(old=old, actual=actual)
+    assert new == [actual[1]]
+    assert resolved == [old[1]]